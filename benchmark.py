@@ -0,0 +1,268 @@
+"""
+Rough timings for some of the algorithms. Run with the names of the sections to run, or no arguments
+to run all of them:
+
+    python benchmark.py fixedbase
+"""
+import os
+import sys
+import tempfile
+from functools import partial
+from math import pi, sqrt
+from random import randint
+from time import perf_counter
+
+from discrete.fixedbase import FixedBaseExp
+from discrete import ec, rsa, factor, arith, sieve
+from discrete.primality import random_prime
+from discrete import dlp
+from discrete.group import MultiplicativeGroup
+from discrete.cache import Cache
+from discrete.shanks import shanks
+
+
+def timed(f, *args):
+    """Calls f(*args) and returns (result, seconds)."""
+    start = perf_counter()
+    result = f(*args)
+    return result, perf_counter() - start
+
+
+def bench_fixedbase():
+    print("Fixed-base exponentiation g^x (mod p), exponentiations per second:")
+    for bits in (1024, 2048):
+        # Not prime, but that does not matter for timing.
+        p = randint(2 ** (bits - 1), 2**bits - 1) | 1
+        g = randint(2, p - 2)
+        xs = [randint(1, p - 2) for _ in range(0, 500)]
+
+        plain, t_plain = timed(lambda: [pow(g, x, p) for x in xs])
+        for window in (4, 6, 8):
+            gexp, t_build = timed(FixedBaseExp, g, p, None, window)
+            fixed, t_fixed = timed(gexp.batch, xs)
+            assert fixed == plain
+            print(
+                f"  {bits} bits, w={window}: pow {len(xs) / t_plain:8.0f}/s, "
+                f"table {len(xs) / t_fixed:8.0f}/s ({t_plain / t_fixed:.1f}x), "
+                f"build {t_build * 1000:.0f} ms"
+            )
+
+
+def bench_ec():
+    print("Elliptic curve scalar multiplication, multiplications per second:")
+    for curve in (ec.SECP256K1, ec.P256):
+        ks = [randint(1, curve.n - 1) for _ in range(0, 200)]
+        ls = [randint(1, curve.n - 1) for _ in range(0, 200)]
+        G = curve.G
+        Q = curve.mul(randint(1, curve.n - 1), G)
+
+        def affine_mul(k, P):
+            # Textbook double-and-add, with an inversion in every step.
+            R = None
+            while k:
+                if k & 1:
+                    R = curve.add(R, P)
+                P, k = curve.double(P), k >> 1
+            return R
+
+        _, t = timed(lambda: [affine_mul(k, G) for k in ks[:50]])
+        print(f"  {curve.name}, kP, affine: {50 / t:6.0f}/s")
+        for w in (4, 5):
+            _, t = timed(lambda: [curve.mul(k, G, w) for k in ks])
+            print(f"  {curve.name}, kP, w={w}: {len(ks) / t:6.0f}/s")
+        _, t = timed(lambda: [curve.mul2(k, G, l, Q) for k, l in zip(ks, ls)])
+        print(f"  {curve.name}, kP + lQ: {len(ks) / t:6.0f}/s")
+        _, t = timed(curve.mul_many, ks, G)
+        print(f"  {curve.name}, kP batched: {len(ks) / t:6.0f}/s")
+
+
+def bench_rsa():
+    print("RSA key generation (mean over a few keys) and decryption, with 2, 3 and 4 primes:")
+    for bits, keys, messages in ((2048, 3, 50), (4096, 1, 10)):
+        for num_primes in (2, 3, 4):
+            pairs, t_gen = timed(lambda: [rsa.generate_keys(bits, num_primes=num_primes) for _ in range(keys)])
+            privkey, pubkey = pairs[-1]
+            cs = [rsa.encrypt(randint(0, pubkey.n - 1), pubkey) for _ in range(0, messages)]
+            plain = rsa.PrivateKey(privkey.n, privkey.d)
+            ms, t_plain = timed(lambda: [rsa.decrypt(c, plain) for c in cs])
+            crt, t_crt = timed(lambda: [rsa.decrypt(c, privkey) for c in cs])
+            assert ms == crt
+            print(
+                f"  {bits} bits, {num_primes} primes: keygen {t_gen / keys * 1000:6.0f} ms, "
+                f"decrypt {len(cs) / t_plain:5.0f}/s without CRT, {len(cs) / t_crt:5.0f}/s with CRT"
+            )
+
+
+def bench_fermat():
+    print("Fermat factoring, values of a tried per second:")
+    # Primes far apart, so every step is taken.
+    n = random_prime(2**200, 2**201) * random_prime(2**300, 2**301)
+    steps = 1 << 22
+
+    def naive():
+        # An isqrt() for every a.
+        a = arith.isqrt(n) + 1
+        for x in range(a, a + steps // 64):
+            b2 = x * x - n
+            if arith.isqrt(b2) ** 2 == b2:
+                return x
+
+    _, t = timed(naive)
+    print(f"  isqrt every a:  {steps // 64 / t:12.0f}/s")
+    _, t = timed(factor.fermat, n, steps, False)
+    print(f"  residue filter: {steps / t:12.0f}/s")
+    if factor.np is not None:
+        _, t = timed(factor.fermat, n, steps, True)
+        print(f"  numpy blocks:   {steps / t:12.0f}/s")
+
+
+def bench_arith():
+    print("Big integer arithmetic by backend, operations per second:")
+    previous = arith.backend()
+    try:
+        # Mersenne primes, so that there is nothing to search for.
+        for e in (521, 2203, 4253):
+            p = 2**e - 1
+            xs = [randint(2, p - 2) for _ in range(0, 20)]
+            for name in arith.available():
+                arith.set_backend(name)
+                _, t_pow = timed(lambda: [arith.powmod(x, x, p) for x in xs])
+                _, t_inv = timed(lambda: [arith.invert(x, p) for x in xs])
+                _, t_prime = timed(lambda: [arith.is_probable_prime(p) for _ in range(0, 2)])
+                print(
+                    f"  {e} bits, {name:6}: powmod {len(xs) / t_pow:8.0f}/s, "
+                    f"invert {len(xs) / t_inv:8.0f}/s, is_probable_prime {2 / t_prime:6.1f}/s"
+                )
+    finally:
+        arith.set_backend(previous)
+
+
+def bench_rho():
+    print("Pollard's rho, mean steps of the walk relative to sqrt(pi q / 2):")
+    # p = 2 k q + 1, and g = 2^(2k) has prime order q.
+    for q, p in ((1000003, 1000003 * 2 * 18 + 1), (10000019, 10000019 * 2 * 4 + 1)):
+        group = MultiplicativeGroup(p, q)
+        g = pow(2, (p - 1) // q, p)
+        assert g != 1 and pow(g, q, p) == 1
+        for name, walk in (
+            ("pollard", dlp.pollard_walk),
+            ("teske r=8", partial(dlp.teske_walk, r=8)),
+            ("teske r=20", dlp.teske_walk),
+        ):
+            steps = 0
+
+            def counted(group, g, h):
+                f = walk(group, g, h)
+
+                def step(*state):
+                    nonlocal steps
+                    steps += 1
+                    return f(*state)
+
+                return step
+
+            runs = 30
+            for _ in range(0, runs):
+                x = randint(1, q - 1)
+                assert dlp.pollard_rho_group(group, g, pow(g, x, p), walk=counted) == x
+            print(f"  q = {q}, {name:10}: {steps / runs / sqrt(pi * q / 2):.2f}")
+
+
+def bench_cache():
+    print("Discrete log cache, time per call:")
+    p, g = 1000003, 2
+    hs = [randint(1, p - 1) for _ in range(0, 200)]
+    with tempfile.TemporaryDirectory() as tmp, Cache(os.path.join(tmp, "cache.sqlite")) as cache:
+        _, t_cold = timed(lambda: [shanks(g, h, p, cache=cache) for h in hs])
+        _, t_hit = timed(lambda: [shanks(g, h, p, cache=cache) for h in hs * 10])
+        print(f"  miss (solve and store): {t_cold / len(hs) * 1e6:8.0f} us")
+        print(f"  hit:                    {t_hit / len(hs) / 10 * 1e6:8.0f} us")
+        print(f"  hit rate: {cache.hit_rate:.2f}")
+
+
+def bench_factorint():
+    print("factorint() on random composites, seconds per number (failures included):")
+    for bits in (64, 96, 128):
+        times, failed = [], 0
+        for _ in range(0, 20):
+            n = randint(2 ** (bits - 1), 2**bits - 1)
+            start = perf_counter()
+            try:
+                factor.factorint(n)
+            except ValueError:
+                failed += 1
+            times.append(perf_counter() - start)
+        print(
+            f"  {bits} bits: mean {sum(times) / len(times):.3f}, max {max(times):.3f}, "
+            f"failed {failed} of {len(times)}"
+        )
+
+
+def bench_verify():
+    print("RSA signature verification, signatures per second:")
+    privkey, _ = rsa.generate_keys(2048, num_primes=3)
+    n = privkey.n
+    order = rsa._order(*privkey.primes)
+    for e in (2**16 + 1, None):
+        if e is None:
+            # A full size exponent.
+            e = randint(2, order - 1) | 1
+            while arith.gcd(e, order) != 1:
+                e += 2
+        d = arith.invert(e, order)
+        pubkey = rsa.PublicKey(n, e)
+        key = rsa.CRTPrivateKey.from_primes(privkey.primes, d)
+        pairs = [(m, rsa.sign(m, key)) for m in (randint(0, n - 1) for _ in range(0, 4096))]
+        label = "e = 65537" if e == 2**16 + 1 else "e full size"
+
+        count = len(pairs) if e == 2**16 + 1 else 200
+        _, t = timed(lambda: [rsa.verify(m, s, pubkey) for m, s in pairs[:count]])
+        print(f"  {label}, one at a time:      {count / t:8.0f}/s")
+        for bits in (16, 32, 64):
+            bad, t = timed(rsa.verify_batch, pairs, pubkey, 4096, bits)
+            assert bad == []
+            print(f"  {label}, batch, {bits:2} subsets: {len(pairs) / t:8.0f}/s")
+
+
+def bench_sieve():
+    def whole(n):
+        # A plain sieve of the whole range at once, for comparison.
+        flags = bytearray([1]) * (n + 1)
+        flags[0:2] = b"\x00\x00"
+        for i in range(2, arith.isqrt(n) + 1):
+            if flags[i]:
+                flags[i * i :: i] = bytes(len(range(i * i, n + 1, i)))
+        return [i for i, f in enumerate(flags) if f]
+
+    print(f"primes up to n, seconds ({'numpy' if sieve.np is not None else 'bytearray'} flags):")
+    limit = sieve.memo_limit()
+    sieve.set_memo_limit(10)
+    for n in (10**6, 10**7, 10**8):
+        line = f"  n = 10^{len(str(n)) - 1}: segmented {timed(sieve.primes_up_to, n)[1]:.3f}"
+        line += f", 4 processes {timed(sieve.primes_up_to, n, 4)[1]:.3f}"
+        if n <= 10**7:
+            line += f", whole range {timed(whole, n)[1]:.3f}"
+        print(line)
+    sieve.set_memo_limit(limit)
+    start = 10**12
+    _, t = timed(lambda: sum(1 for _ in sieve.iter_primes(start, start + 10**7)))
+    print(f"  iter_primes over [10^12, 10^12 + 10^7): {t:.3f}")
+
+
+SECTIONS = {
+    "fixedbase": bench_fixedbase,
+    "ec": bench_ec,
+    "rsa": bench_rsa,
+    "fermat": bench_fermat,
+    "arith": bench_arith,
+    "rho": bench_rho,
+    "cache": bench_cache,
+    "factorint": bench_factorint,
+    "verify": bench_verify,
+    "sieve": bench_sieve,
+}
+
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or SECTIONS:
+        SECTIONS[name]()
@@ -0,0 +1,46 @@
+import argparse
+import sys
+
+from .jobs import run
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m discrete")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser(
+        "run", help="run DLP, factoring and primality jobs from a JSON lines file"
+    )
+    run_parser.add_argument("jobs", help="the job file, or - for standard input")
+    run_parser.add_argument(
+        "-o", "--output", default="-", help="where to write the results (default: standard output)"
+    )
+    run_parser.add_argument(
+        "-j", "--workers", type=int, default=None,
+        help="number of worker processes (default: one per CPU, 0: no worker processes)",
+    )
+    run_parser.add_argument(
+        "--max-in-flight", type=int, default=None,
+        help="maximum number of jobs submitted but not yet written (default: 4 per worker)",
+    )
+    run_parser.add_argument(
+        "--unordered", action="store_true",
+        help="write results as they complete instead of in job order",
+    )
+
+    args = parser.parse_args(argv)
+
+    jobs = sys.stdin if args.jobs == "-" else open(args.jobs, "r")
+    out = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        run(jobs, out, args.workers, not args.unordered, args.max_in_flight)
+    finally:
+        if jobs is not sys.stdin:
+            jobs.close()
+        if out is not sys.stdout:
+            out.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""
+Big integer arithmetic for the rest of the package, with a choice of backend.
+
+Python's own int is fine for numbers of a few hundred bits, but for thousands of bits (RSA, large
+primes) the GMP library is a lot quicker, mostly because of its asymptotically faster multiplication.
+When gmpy2 is installed it is used, otherwise everything falls back to pure Python. Both backends
+take and return plain ints and raise the same exceptions, so the rest of the code does not have to
+care which one is in use:
+
+    from . import arith
+    arith.powmod(g, x, p)
+
+The backend can be chosen with the environment variable DISCRETE_ARITH_BACKEND ("python" or
+"gmpy2"), read when this module is first imported, or at any time with set_backend().
+"""
+import os
+from math import gcd as _gcd, isqrt as _isqrt
+from random import randint
+from typing import Tuple
+
+from .sieve import primes_up_to
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+BACKENDS = ("python", "gmpy2")
+
+# Trial division by these before any Miller-Rabin rounds.
+_SMALL_PRIMES = tuple(primes_up_to(97))
+
+
+def _py_powmod(a: int, k: int, n: int) -> int:
+    return pow(a, k, n)
+
+
+def _py_invert(a: int, n: int) -> int:
+    try:
+        return pow(a, -1, n)
+    except ValueError:
+        raise ValueError(f"{a} is not invertible modulo {n}.") from None
+
+
+def _py_gcd(a: int, b: int) -> int:
+    return _gcd(a, b)
+
+
+def _py_gcdext(a: int, b: int) -> Tuple[int, int, int]:
+    # Same loop as euclidean.extended(), without its special cases.
+    u_p2, u_p1 = 1, 0
+    r2, r1 = a, b
+    while r1 != 0:
+        q, r = divmod(r2, r1)
+        u_p1, u_p2 = u_p2 - q * u_p1, u_p1
+        r1, r2 = r, r1
+    d, u = r2, u_p2
+    v = (d - u * a) // b if b else 0
+    if d < 0:
+        d, u, v = -d, -u, -v
+    return d, u, v
+
+
+def _py_isqrt(n: int) -> int:
+    return _isqrt(n)
+
+
+def _py_is_probable_prime(n: int, reps: int = 25) -> bool:
+    if n < 2:
+        return False
+    for p in _SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < _SMALL_PRIMES[-1] ** 2:
+        return True
+
+    # Miller-Rabin, see primality.miller_rabin() for how this works.
+    q, k = n - 1, 0
+    while q % 2 == 0:
+        q, k = q // 2, k + 1
+    for _ in range(0, reps):
+        b = pow(randint(2, n - 2), q, n)
+        if b == 1 or b == n - 1:
+            continue
+        for _ in range(1, k):
+            b = b * b % n
+            if b == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _gmp_powmod(a: int, k: int, n: int) -> int:
+    try:
+        return int(gmpy2.powmod(a, k, n))
+    except ZeroDivisionError:
+        # Negative k and a not invertible.
+        raise ValueError(f"{a} is not invertible modulo {n}.") from None
+
+
+def _gmp_invert(a: int, n: int) -> int:
+    try:
+        return int(gmpy2.invert(a, n))
+    except ZeroDivisionError:
+        raise ValueError(f"{a} is not invertible modulo {n}.") from None
+
+
+def _gmp_gcd(a: int, b: int) -> int:
+    return int(gmpy2.gcd(a, b))
+
+
+def _gmp_gcdext(a: int, b: int) -> Tuple[int, int, int]:
+    d, u, v = gmpy2.gcdext(a, b)
+    return int(d), int(u), int(v)
+
+
+def _gmp_isqrt(n: int) -> int:
+    return int(gmpy2.isqrt(n))
+
+
+def _gmp_is_probable_prime(n: int, reps: int = 25) -> bool:
+    return n >= 2 and bool(gmpy2.is_prime(n, reps))
+
+
+_IMPLEMENTATIONS = {
+    "python": (_py_powmod, _py_invert, _py_gcd, _py_gcdext, _py_isqrt, _py_is_probable_prime),
+    "gmpy2": (_gmp_powmod, _gmp_invert, _gmp_gcd, _gmp_gcdext, _gmp_isqrt, _gmp_is_probable_prime),
+}
+
+
+def available() -> Tuple[str, ...]:
+    """The backends that can be used here."""
+    return tuple(name for name in BACKENDS if name != "gmpy2" or gmpy2 is not None)
+
+
+def backend() -> str:
+    """The name of the backend in use."""
+    return _backend
+
+
+def set_backend(name: str):
+    """Switches every function in this module to the named backend."""
+    global _backend, powmod, invert, gcd, gcdext, isqrt, is_probable_prime
+    if name not in BACKENDS:
+        raise ValueError(f"unknown arithmetic backend {name!r}, expected one of {', '.join(BACKENDS)}.")
+    if name not in available():
+        raise ValueError(f"the {name} arithmetic backend is not installed.")
+    powmod, invert, gcd, gcdext, isqrt, is_probable_prime = _IMPLEMENTATIONS[name]
+    _backend = name
+
+
+# These are replaced by set_backend(), the python ones are only here to document them.
+
+
+def powmod(a: int, k: int, n: int) -> int:
+    """a^k mod n. A negative k means a power of the inverse of a, ValueError if there is none."""
+    return _py_powmod(a, k, n)
+
+
+def invert(a: int, n: int) -> int:
+    """The inverse of a modulo n, raises ValueError if there is none."""
+    return _py_invert(a, n)
+
+
+def gcd(a: int, b: int) -> int:
+    """The (non-negative) greatest common divisor of a and b."""
+    return _py_gcd(a, b)
+
+
+def gcdext(a: int, b: int) -> Tuple[int, int, int]:
+    """
+    (d, u, v) with d = gcd(a, b) = a u + b v. The backends may pick different u and v when there is
+    more than one small pair.
+    """
+    return _py_gcdext(a, b)
+
+
+def isqrt(n: int) -> int:
+    """The largest x with x^2 <= n, for n >= 0."""
+    return _py_isqrt(n)
+
+
+def is_probable_prime(n: int, reps: int = 25) -> bool:
+    """False if n is certainly not a prime, True if it passed reps rounds of Miller-Rabin."""
+    return _py_is_probable_prime(n, reps)
+
+
+_backend = "python"
+set_backend(os.environ.get("DISCRETE_ARITH_BACKEND") or ("gmpy2" if gmpy2 is not None else "python"))
@@ -0,0 +1,196 @@
+"""
+A persistent cache of results that are expensive to compute and often asked for again: discrete
+logarithms, factorisations of group orders and primitive root checks. It lives in an SQLite database,
+so it survives between runs and can be shared by any number of processes at once.
+
+The solvers take it as an opt-in cache= parameter:
+
+    cache = Cache("discrete.sqlite")
+    shanks(g, h, p, cache=cache)        # solves, and stores x
+    shanks(g, h, p, cache=cache)        # a lookup
+    pollard_rho(g, h, p, cache=cache)   # the same answer, so also a lookup
+    print(cache.hit_rate)
+
+The discrete logarithm solvers share their entries since they all give the smallest solution x (for
+pollard_rho() that is its answer reduced modulo the order of g).
+
+Entries are evicted least recently used first once there are more than max_entries of them.
+"""
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Callable, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (kind, key)
+);
+CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used);
+"""
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return "MISSING"
+
+
+# What Cache.get() returns for a key that is not there. None is a perfectly good value to store (no
+# solution), so it can not be used for this.
+MISSING = _Missing()
+
+
+class Cache:
+    """
+    The cache in the SQLite database at path, created if it does not exist. Values are anything JSON
+    can hold (note that dictionaries get string keys).
+
+    The database is in WAL mode, so readers do not block the writer and the other way around, and
+    every process opens its own connection (a connection must not cross a fork). Lookups only read:
+    the last use times of hits are kept in memory and written out along with the next store, every
+    flush_every hits, or on close(). The order of eviction is thus slightly stale, which does not
+    matter for an LRU cache.
+
+    hits, misses and hit_rate count the lookups made through this object (in this process).
+    """
+
+    def __init__(self, path: str, max_entries: int = 1 << 20, flush_every: int = 256):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_every = flush_every
+        self.hits = 0
+        self.misses = 0
+        self._pid = None
+        self._db = None
+        self._touched = {}
+        self._stores = 0
+        self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._pid != os.getpid():
+            # A new process, the connection (if any) belongs to the parent.
+            self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            # With WAL this loses nothing on a process crash, only maybe the last commits on power loss.
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.executescript(_SCHEMA)
+            self._pid = os.getpid()
+            self._touched = {}
+        return self._db
+
+    @staticmethod
+    def _key(key: Tuple) -> str:
+        return ",".join(str(v) for v in key)
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of lookups that were hits, 0 if there were none."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def get(self, kind: str, key: Tuple) -> Any:
+        """The value stored for kind and key (a tuple of ints, say), or MISSING."""
+        db = self._connect()
+        k = self._key(key)
+        row = db.execute("SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, k)).fetchone()
+        if row is None:
+            self.misses += 1
+            return MISSING
+        self.hits += 1
+        self._touched[kind, k] = time.time()
+        if len(self._touched) >= self.flush_every:
+            self.flush()
+        return json.loads(row[0])
+
+    def put(self, kind: str, key: Tuple, value: Any):
+        """Stores value for kind and key, replacing what was there."""
+        db = self._connect()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, value, last_used) VALUES (?, ?, ?, ?)",
+                (kind, self._key(key), json.dumps(value), time.time()),
+            )
+            self._write_touched(db)
+            self._stores += 1
+            # Counting rows is not free, so only check now and then (and always for small caches).
+            if self._stores % 64 == 0 or self.max_entries < 1024:
+                self._evict(db)
+
+    def _write_touched(self, db: sqlite3.Connection):
+        if self._touched:
+            db.executemany(
+                "UPDATE entries SET last_used = MAX(last_used, ?) WHERE kind = ? AND key = ?",
+                ((t, kind, k) for (kind, k), t in self._touched.items()),
+            )
+            self._touched = {}
+
+    def _evict(self, db: sqlite3.Connection):
+        (count,) = db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        if count > self.max_entries:
+            db.execute(
+                "DELETE FROM entries WHERE rowid IN "
+                "(SELECT rowid FROM entries ORDER BY last_used LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def flush(self):
+        """Writes out the last use times of hits."""
+        if self._touched and self._pid == os.getpid():
+            with self._db:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._write_touched(self._db)
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def clear(self):
+        """Removes every entry (and resets the counters)."""
+        db = self._connect()
+        with db:
+            db.execute("BEGIN IMMEDIATE")
+            db.execute("DELETE FROM entries")
+        self._touched = {}
+        self.hits = self.misses = 0
+
+    def close(self):
+        if self._db is not None and self._pid == os.getpid():
+            self.flush()
+            self._db.close()
+        self._db = self._pid = None
+
+    def __enter__(self) -> "Cache":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __getstate__(self):
+        # Only the settings go to other processes, they open their own connection.
+        return {"path": self.path, "max_entries": self.max_entries, "flush_every": self.flush_every}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def cached(
+    cache: Cache, kind: str, key: Tuple, compute: Callable[[], Any], keep: Callable[[Any], bool] = None
+) -> Any:
+    """
+    compute(), looked up in cache first if it is not None, and stored there afterwards if keep(result)
+    (by default always). Saves every solver from doing this dance itself.
+    """
+    if cache is None:
+        return compute()
+    value = cache.get(kind, key)
+    if value is MISSING:
+        value = compute()
+        if keep is None or keep(value):
+            cache.put(kind, key, value)
+    return value
@@ -0,0 +1,69 @@
+from random import randint
+from typing import Tuple, List, Iterable
+from .fixedbase import FixedBaseExp
+from . import arith
+
+
+def generate_private(p: int) -> int:
+    """Picks a random private exponent 2 <= x <= p - 2."""
+    if p < 5:
+        raise ValueError("p must be at least 5.")
+    return randint(2, p - 2)
+
+
+def public(x: int, g: int, p: int) -> int:
+    """The public value g^x (mod p) sent to the other party."""
+    return arith.powmod(g, x, p)
+
+
+def shared_secret(x: int, other_public: int, p: int) -> int:
+    """
+    Computes the shared secret from our private exponent x and the other party's public value
+    g^y, which is (g^y)^x = g^(xy) (mod p). Both parties end up with the same number.
+    """
+    return arith.powmod(other_public, x, p)
+
+
+class DiffieHellman:
+    """
+    Diffie-Hellman key agreement in F_p* for fixed parameters g and p.
+
+    The parameters are public and usually fixed for a whole deployment, so g^x is computed with a
+    precomputed FixedBaseExp table rather than pow. The shared secret (g^y)^x has a different base
+    for every peer, so it can not use the table.
+
+    p should be a prime and g a generator of F_p* (or of a large subgroup of it, in which case its
+    order can be given).
+
+    >>> dh = DiffieHellman(2, 2579)
+    >>> x, X = dh.keypair()
+    >>> y, Y = dh.keypair()
+    >>> dh.shared(x, Y) == dh.shared(y, X)
+    True
+    """
+
+    def __init__(self, g: int, p: int, order: int = None, window: int = 4):
+        self.g = g
+        self.p = p
+        self._gexp = FixedBaseExp(g, p, order, window)
+
+    def public(self, x: int) -> int:
+        """Same as public(x, g, p)."""
+        return self._gexp(x)
+
+    def shared(self, x: int, other_public: int) -> int:
+        """Same as shared_secret(x, other_public, p)."""
+        return shared_secret(x, other_public, self.p)
+
+    def keypair(self) -> Tuple[int, int]:
+        """Generates a random private exponent x and returns it along with g^x."""
+        x = generate_private(self.p)
+        return x, self._gexp(x)
+
+    def keypairs(self, count: int) -> List[Tuple[int, int]]:
+        """Generates count key pairs, see keypair()."""
+        return [self.keypair() for _ in range(0, count)]
+
+    def public_batch(self, xs: Iterable[int]) -> List[int]:
+        """Returns [g^x (mod p) for x in xs]."""
+        return self._gexp.batch(xs)
@@ -1,85 +1,696 @@
-from typing import Union, Tuple
+import multiprocessing
+import queue
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from math import exp, log, sqrt, prod, isqrt
+from random import randrange, Random
+from typing import Union, Any, List, Dict, Tuple, Hashable, Callable
 
-from pyrsistent import rex
-from .euclidean import extended as egcd
+from .euclidean import crt
+from .group import Group, MultiplicativeGroup
+from .shanks import shanks_group
+from .factor import factorint
+from .sieve import primes_up_to
+from .linalg import solve_sparse
+from . import arith
+from .cache import Cache, cached
 
 # TODO move Shanks in to this.
 
+# When a collision only pins the logarithm down to more than this many candidates we would rather
+# restart the walk than try them all.
+_MAX_CANDIDATES = 1 << 16
 
-def pollard_rho(g: int, h: int, p: int, max_iter: int = None) -> Union[None, int]:
+
+def pollard_walk(group: Group, g: Any, h: Any) -> Callable[[Any, int, int], Tuple[Any, int, int]]:
+    """
+    Pollard's original walk for pollard_rho_group(): the elements are split into three parts by a hash,
+    and x is multiplied by h, multiplied by g or squared depending on which part it is in. Simple, but
+    it takes noticeably more steps than a random map would.
+    """
+    q = group.order
+
+    # x = g^a h^b, and we also know a and b. Each step we "advance" x by f, which is chosen such that
+    # after a number of steps, we enter a cycle. The map can be expressed in terms of the exponents,
+    # modulo the order of the group.
+    def f(x, a, b):
+        s = hash(group.encode(x)) % 3
+        if s == 0:
+            return group.op(x, h), a, (b + 1) % q
+        elif s == 1:
+            return group.op(x, g), (a + 1) % q, b
+        else:
+            return group.op(x, x), 2 * a % q, 2 * b % q
+
+    return f
+
+
+def teske_walk(group: Group, g: Any, h: Any, r: int = 20) -> Callable[[Any, int, int], Tuple[Any, int, int]]:
+    """
+    Teske's r-adding walk for pollard_rho_group(): r multipliers M_i = g^(a_i) h^(b_i) are picked at
+    random, and x is multiplied by M_i where i is a hash of x modulo r. With r = 20 this behaves
+    close enough to a random map that the expected number of steps is about sqrt(pi order / 2), and
+    every step is a single multiplication.
+
+    Use functools.partial(teske_walk, r=...) for another r.
+    """
+    q = group.order
+    exponents = [(randrange(0, q), randrange(0, q)) for _ in range(0, r)]
+    multipliers = [group.op(group.exp(g, a), group.exp(h, b)) for a, b in exponents]
+
+    def f(x, a, b):
+        i = hash(group.encode(x)) % r
+        da, db = exponents[i]
+        return group.op(x, multipliers[i]), (a + da) % q, (b + db) % q
+
+    return f
+
+
+Walk = Callable[[Group, Any, Any], Callable[[Any, int, int], Tuple[Any, int, int]]]
+
+
+def pollard_rho(
+    g: int, h: int, p: int, max_iter: int = None, walk: Walk = teske_walk, cache: Cache = None
+) -> Union[None, int]:
     """Pollard's rho collision algorithm for solving the DLP:
 
         g^x = h  (mod p)
 
     p should be a prime. To guarantee an answer, g should be a generator of F_p (primitive root).
+
+    This is pollard_rho_group() in the group F_p*. If g is known to lie in a subgroup of prime order q,
+    use pollard_rho_group(MultiplicativeGroup(p, q), g, h) instead, which needs about sqrt(q) rather
+    than sqrt(p) iterations.
+
+    The answer is reduced modulo the order of g, so it is the smallest x as with shanks() and
+    pohlig_hellman(). That needs p - 1 factored, which is cheap next to the walk.
+
+    With a cache (see discrete.cache) the answer is looked up there first, and stored there afterwards
+    if one was found (None might only mean that max_iter was too small).
+    """
+
+    def solve():
+        x = pollard_rho_group(MultiplicativeGroup(p), g, h, max_iter, walk=walk)
+        return None if x is None else x % multiplicative_order(g, p, cache=cache)
+
+    return cached(cache, "dlog", (g % p, h % p, p), solve, keep=lambda x: x is not None)
+
+
+def pollard_rho_group(
+    group: Group, g: Any, h: Any, max_iter: int = None, retries: int = 3, walk: Walk = teske_walk
+) -> Union[None, int]:
     """
-    x, y = 1, 1
-    max_iter = p
+    Pollard's rho for the DLP g^x = h in any group, see the Group protocol. Returns an x with
+    0 <= x < group.order, or None if no solution was found. If g generates the group x is the only
+    one, otherwise it is one of several, and not necessarily the smallest.
 
-    p_by_3 = p // 3
-    p_min_1 = p - 1
+    walk(group, g, h) gives the map the walk iterates, a function (x, a, b) -> (x', a', b') of
+    elements x = g^a h^b. It is teske_walk() by default, pollard_walk() is the classic one. Cycles are
+    found with Brent's method, which costs one step of the walk per iteration (Floyd's takes three).
+
+    The walk takes about sqrt(pi order / 2) steps, and max_iter (default: the order) bounds it. A walk
+    can collide in a useless way (the collision says nothing about x, which happens more often when g
+    does not generate the group), in which case we start over from a random point with a fresh walk,
+    at most retries times.
+    """
+    q = group.order
+    if max_iter is None:
+        max_iter = q
 
-    # x = g^x h^b
     a, b = 0, 0
-    # y = g^c h^d
-    c, d = 0, 0
-
-    def rexp(v):
-        return v % p_min_1
-
-    # Each step we "advance" x once, and y twice. This is done with the scrambling function
-    # f, which is chosen such that after a number of steps, we enter a cycle.
-    # The map can be expressed in terms of the exponents (and so mod p-1).
-    def f_g(z, a):
-        v = 0
-        if 0 <= z < p_by_3:
-            v = a + 1
-        elif p_by_3 <= z < 2 * p_by_3:
-            v = 2 * a
-        else:
-            v = a
-        return rexp(v)
-
-    def f_h(z, b):
-        v = 0
-        if 0 <= z < p_by_3:
-            v = b
-        elif p_by_3 <= z < 2 * p_by_3:
-            v = 2 * b
-        else:
-            v = b + 1
-        return rexp(v)
+    for _ in range(0, retries + 1):
+        f = walk(group, g, h)
+        x = group.op(group.exp(g, a), group.exp(h, b))
+        # Brent's cycle finding: y is x as it was at the last power of two. Once x is in the cycle,
+        # and the power of two is at least the cycle length, x comes back around to y.
+        y, c, d = x, a, b
+        power, length = 1, 0
+        ycode = group.encode(y)
+        found = False
+        for _ in range(0, max_iter):
+            x, a, b = f(x, a, b)
+            length += 1
+            xcode = group.encode(x)
+            if xcode == ycode:
+                found = True
+                break
+            if length == power:
+                y, c, d, ycode = x, a, b, xcode
+                power, length = 2 * power, 0
+
+        if not found:
+            return None
+
+        solutions = _solve_collision(group, g, h, a, b, c, d)
+        if solutions is not None:
+            return solutions[0]
+        a, b = randrange(0, q), randrange(0, q)
+
+    return None
+
 
-    def step():
-        nonlocal x, y, a, b, c, d
-        a, b = f_g(x, a), f_h(x, b)
-        x = (pow(g, a, p) * pow(h, b, p)) % p
+def _solve_collision(
+    group: Group, g: Any, h: Any, a: int, b: int, c: int, d: int
+) -> Union[None, List[int]]:
+    """
+    Given g^a h^b = g^c h^d, returns the sorted solutions x to g^x = h, 0 <= x < order, that the
+    collision gives. Returns None if it gives none, or too many candidates to be useful.
+    """
+    q = group.order
+
+    # Now we know g^(a-c) = h^(d-b), or with x = log_g(h), A = B x  (mod q).
+    A = (a - c) % q
+    B = (d - b) % q
+    e, u, _ = arith.gcdext(B, q)
+    # The relation only holds modulo the order of g, which is a divisor of q. If g does not generate
+    # the group it can thus fail modulo q, or point at the wrong candidates, for a perfectly good x.
+    if A % e != 0:
+        return None
+    if e > _MAX_CANDIDATES:
+        return None
 
-        for _ in range(0, 2):
-            c, d = f_g(y, c), f_h(y, d)
-            y = (pow(g, c, p) * pow(h, d, p)) % p
+    # We now have u B = e  (mod q) so e x = u A  (mod q), and thus x = s  (mod q / e).
+    # The solutions to log_g(h) (if g generator) is now somewhere among s + k q / e, k = 0, ..., e - 1.
+    # Stepping through them costs one group operation each.
+    s = (u * (A // e)) % (q // e)
+    hcode = group.encode(h)
+    y, step = group.exp(g, s), group.exp(g, q // e)
+    solutions = []
+    for k in range(0, e):
+        if group.encode(y) == hcode:
+            solutions.append(s + k * (q // e))
+        y = group.op(y, step)
+    # Empty when h is not a power of g, or for the reason above. Either way another walk may do better.
+    return solutions or None
 
-    step()
-    i = 1
-    while x != y and 1 <= i < max_iter:
-        step()
-        i += 1
 
-    if x != y:
+# Pollard's kangaroos jump by one of this many distances.
+_KANGAROO_JUMPS = 32
+
+
+def kangaroo(
+    g: int, h: int, p: int, lo: int, hi: int, processes: int = 1, max_steps: int = None
+) -> Union[None, int]:
+    """
+    Pollard's kangaroo (lambda) method for g^x = h  (mod p) when x is known to lie in [lo, hi]. This is
+    kangaroo_group() in the group F_p*, see there.
+    """
+    return kangaroo_group(MultiplicativeGroup(p), g, h, lo, hi, processes, max_steps)
+
+
+def kangaroo_group(
+    group: Group,
+    g: Any,
+    h: Any,
+    lo: int,
+    hi: int,
+    processes: int = 1,
+    max_steps: int = None,
+    herd: int = 4,
+    seed: int = None,
+) -> Union[None, int]:
+    """
+    Pollard's kangaroo method, with distinguished points, for g^x = h with lo <= x <= hi in any group
+    (see the Group protocol). It takes about 2 sqrt(hi - lo) group operations and constant memory,
+    however large the group, so it beats Shanks and rho when the interval is much smaller than the
+    group (a short exponent, say).
+
+    Tame kangaroos start at known powers g^t in the middle of the interval, wild kangaroos at h g^w.
+    All of them jump forwards, each jump picked by a hash of the current element, so that two
+    kangaroos that ever land on the same element follow the same path from there on. Elements whose
+    hash has its low bits zero are distinguished points, and are the only ones reported. When a tame
+    and a wild kangaroo report the same point, g^(t + d_t) = h g^(w + d_w), which gives x.
+
+    Each of processes worker processes (the current process if 1) runs herd tame and herd wild
+    kangaroos, and the distinguished points are collected here. The total number of jumps over all
+    kangaroos is bounded by max_steps, by default 20 sqrt(hi - lo) plus some slack for the herds.
+
+    If g has order less than hi - lo there might be several solutions, and any of them is returned.
+    Returns None if no solution in [lo, hi] was found.
+    """
+    if hi < lo:
+        raise ValueError("hi must be at least lo.")
+    if processes < 1 or herd < 1:
+        raise ValueError("there must be at least one process and one kangaroo in each herd.")
+    width = hi - lo
+    hcode = group.encode(h)
+
+    def check(x):
+        return lo <= x <= hi and group.encode(group.exp(g, x)) == hcode
+
+    if width < 64:
+        # Not worth jumping around for.
+        return next((x for x in range(lo, hi + 1) if check(x)), None)
+
+    kangaroos = 2 * herd * processes
+    if max_steps is None:
+        max_steps = 20 * isqrt(width) + 1000 * kangaroos
+    rng = Random(seed)
+
+    # With m kangaroos in total, a mean jump of m sqrt(width) / 4 is optimal (van Oorschot and
+    # Wiener). Distinguished points are roughly every sqrt(width) / 32 jumps.
+    mean = max(1, kangaroos * isqrt(width) // 4)
+    dists = [rng.randint(1, 2 * mean) for _ in range(0, _KANGAROO_JUMPS)]
+    mask = (1 << max(0, (isqrt(width) // 32).bit_length() - 1)) - 1
+
+    args = (group, g, h, lo, width, dists, mask, herd)
+    seen = {}
+    if processes == 1:
+        steps = 0
+        for points in _kangaroo_herd(*args, rng.randrange(1 << 32)):
+            for point in points:
+                x = _kangaroo_collision(seen, point)
+                if x is not None and check(x):
+                    return x
+            steps += 1024
+            if steps >= max_steps:
+                return None
+
+    ctx = multiprocessing.get_context()
+    results, stop = ctx.Queue(), ctx.Event()
+    workers = [
+        ctx.Process(
+            target=_kangaroo_worker,
+            args=(*args, rng.randrange(1 << 32), max_steps // processes, results, stop),
+            daemon=True,
+        )
+        for _ in range(0, processes)
+    ]
+    for w in workers:
+        w.start()
+    try:
+        running = processes
+        while running:
+            try:
+                points = results.get(timeout=1)
+            except queue.Empty:
+                if not any(w.is_alive() for w in workers):
+                    break
+                continue
+            if points is None:
+                running -= 1
+                continue
+            for point in points:
+                x = _kangaroo_collision(seen, point)
+                if x is not None and check(x):
+                    return x
+        return None
+    finally:
+        stop.set()
+        for w in workers:
+            w.join(timeout=1)
+            if w.is_alive():
+                w.terminate()
+
+
+def _kangaroo_collision(seen: dict, point: Tuple[Hashable, bool, int]) -> Union[None, int]:
+    """Records a distinguished point, returns the x it gives if it was found by the other kind."""
+    code, tame, dist = point
+    other = seen.get(code)
+    if other is None:
+        seen[code] = (tame, dist)
         return None
+    other_tame, other_dist = other
+    if other_tame == tame:
+        return None
+    return other_dist - dist if other_tame else dist - other_dist
+
+
+def _kangaroo_herd(group, g, h, lo, width, dists, mask, herd, seed):
+    """
+    Runs herd tame and herd wild kangaroos forever, yielding the distinguished points (code, tame,
+    distance) found in every 1024 jumps. A tame kangaroo at distance d sits at g^d, a wild one at h g^d.
+    """
+    rng = Random(seed)
+    r = len(dists)
+    jumps = [group.exp(g, d) for d in dists]
+    spread = max(1, width // (4 * herd))
+
+    def start(tame):
+        d = lo + width // 2 + rng.randrange(0, spread) if tame else rng.randrange(0, spread)
+        base = group.identity if tame else h
+        return [group.op(base, group.exp(g, d)), d, tame, None]
+
+    # Each kangaroo is [element, distance, tame, the last distinguished point it found].
+    kangaroos = [start(i % 2 == 0) for i in range(0, 2 * herd)]
+    while True:
+        points = []
+        for _ in range(0, 1024 // len(kangaroos) + 1):
+            for k in kangaroos:
+                code = group.encode(k[0])
+                i = hash(code)
+                j = i % r
+                k[0] = group.op(k[0], jumps[j])
+                k[1] += dists[j]
+                if (i // r) & mask == 0:
+                    if any(o is not k and o[2] == k[2] and o[3] == code for o in kangaroos):
+                        # It has landed on the trail of another from the same herd, so it would only
+                        # be retracing those steps.
+                        k[:] = start(k[2])
+                        continue
+                    k[3] = code
+                    # The point is the element before the jump, at the old distance.
+                    points.append((code, k[2], k[1] - dists[j]))
+        yield points
+
 
-    # Now we know g^(a-c) = h(d-b)  (mod p)
-    A = rexp(a - c)
-    B = rexp(d - b)
-    d, u, v = egcd(B, p_min_1)
-
-    s = rexp((u * A) // d)
-    # We now have s * A = d * log_g(h)   mod (p - 1)
-    # We also now know d divides the left hand side, and so log_g(h) should have d many solutions.
-    # The solutions to log_g(h) (if g generator) is now somewhere among s + k * (p - 1) / d
-    possible_dlogs = [rexp(s + k * (p_min_1 // d)) for k in range(0, d)]
-    solutions = sorted(dlog for dlog in possible_dlogs if pow(g, dlog, p) == h)
-    # This usually happens when g does not generate F_p.
-    if not solutions:
+def _kangaroo_worker(group, g, h, lo, width, dists, mask, herd, seed, max_steps, results, stop):
+    steps = 0
+    for points in _kangaroo_herd(group, g, h, lo, width, dists, mask, herd, seed):
+        if points:
+            results.put(points)
+        steps += 1024
+        if steps >= max_steps or stop.is_set():
+            break
+    results.put(None)
+
+
+def _factor_order(n: int, cache: Cache = None) -> Dict[int, int]:
+    """
+    Factors a group order (typically p - 1) into {prime: exponent} with factor.factorint(). Raises
+    ValueError if it does not manage.
+    """
+    # JSON has no integer keys, so the cache holds a list of pairs.
+    return dict(cached(cache, "factorization", (n,), lambda: sorted(factorint(n).items())))
+
+
+def multiplicative_order(g: int, p: int, factors: Dict[int, int] = None, cache: Cache = None) -> int:
+    """
+    The order of g in F_p*, given the factorisation {q: e} of p - 1 (which is computed if not given, or
+    looked up in cache). Starting from p - 1 we divide out each prime q for as long as g^(order / q) = 1.
+    """
+    if factors is None:
+        factors = _factor_order(p - 1, cache)
+    order = p - 1
+    for q in factors:
+        while order % q == 0 and arith.powmod(g, order // q, p) == 1:
+            order //= q
+    return order
+
+
+def _dlog_prime_power(g: int, h: int, p: int, order: int, q: int, e: int) -> Union[None, int]:
+    """
+    Finds x modulo q^e, where q^e exactly divides the order of g. Then g_q = g^(order / q^e) has order
+    q^e, and x is found one base q digit at a time by a logarithm in the subgroup of order q.
+    """
+    qe = q**e
+    gq, hq = arith.powmod(g, order // qe, p), arith.powmod(h, order // qe, p)
+    gamma = arith.powmod(gq, qe // q, p)
+    ginv = arith.invert(gq, p)
+    group = MultiplicativeGroup(p, q)
+    x = 0
+    for i in range(0, e):
+        hi = arith.powmod(hq * arith.powmod(ginv, x, p) % p, qe // q ** (i + 1), p)
+        d = shanks_group(group, gamma, hi)
+        if d is None:
+            return None
+        x += d * q**i
+    return x
+
+
+def is_primitive_root(g: int, p: int, factors: Dict[int, int] = None, cache: Cache = None) -> bool:
+    """
+    Whether g generates F_p*, p a prime: g^((p - 1) / q) != 1 for every prime q dividing p - 1. The
+    factorisation {q: e} of p - 1 is computed if not given. With a cache both the factorisation and the
+    answer are looked up there first.
+    """
+
+    def check():
+        nonlocal factors
+        if g % p == 0:
+            return False
+        if factors is None:
+            factors = _factor_order(p - 1, cache)
+        return all(arith.powmod(g, (p - 1) // q, p) != 1 for q in factors)
+
+    return cached(cache, "primitive_root", (g % p, p), check)
+
+
+def pohlig_hellman(
+    g: int, h: int, p: int, factors: Dict[int, int] = None, cache: Cache = None
+) -> Union[None, int]:
+    """
+    Solves g^x = h  (mod p) by the Pohlig-Hellman algorithm: the logarithm is found modulo each prime
+    power q^e dividing the order n of g, using Shanks in the subgroup of order q for each of the e
+    digits, and combined with the Chinese Remainder Theorem. This costs about the sum of e sqrt(q), so
+    it is quick when p - 1 has only small prime factors.
+
+    factors is the factorisation {q: e} of p - 1, and is computed when not given. With a cache both
+    the factorisation and the answer are looked up there first.
+
+    Returns the smallest solution x, or None if h is not a power of g.
+    """
+    return cached(cache, "dlog", (g % p, h % p, p), lambda: _pohlig_hellman(g, h, p, factors, cache))
+
+
+def _pohlig_hellman(g: int, h: int, p: int, factors: Dict[int, int], cache: Cache) -> Union[None, int]:
+    if factors is None:
+        factors = _factor_order(p - 1, cache)
+    h %= p
+    order = multiplicative_order(g, p, factors)
+
+    residues, moduli = [], []
+    for q in factors:
+        e = 0
+        while order % q ** (e + 1) == 0:
+            e += 1
+        if e == 0:
+            continue
+        x = _dlog_prime_power(g, h, p, order, q, e)
+        if x is None:
+            return None
+        residues.append(x)
+        moduli.append(q**e)
+
+    x, _ = crt(residues, moduli)
+    return x if arith.powmod(g, x, p) == h else None
+
+
+def _smooth_factorization(y: int, primes: List[int], product: int) -> Union[None, Dict[int, int]]:
+    """
+    Factors y over primes if it is smooth, otherwise returns None. product is the product of the primes.
+
+    Most y are not smooth, so there is an early test which avoids trial division for them: y divides
+    product^(2^k) for 2^k >= log2(y) exactly when every prime factor of y is among the primes. That is
+    a reduction and k squarings modulo y.
+    """
+    r = product % y
+    for _ in range(0, y.bit_length().bit_length()):
+        r = r * r % y
+    if r != 0:
         return None
-    return solutions[0]
+
+    factors = {}
+    for q in primes:
+        if y % q == 0:
+            e = 0
+            while y % q == 0:
+                y //= q
+                e += 1
+            factors[q] = e
+            if y == 1:
+                break
+    return factors
+
+
+def _collect_relations(
+    g: int, p: int, primes: List[int], start: int, step: int, count: int
+) -> List[Tuple[int, Dict[int, int]]]:
+    """
+    The relations (k, factors of g^k) with g^k smooth, for k = start + i step, i = 0, ..., count - 1.
+
+    Stepping by a random step rather than 1 costs the same single multiplication per candidate, but
+    the relations for k and k + 1 would differ only by log(g) when g is in the factor base, which makes
+    them useless as independent equations.
+    """
+    product = prod(primes)
+    relations = []
+    y, t = arith.powmod(g, start, p), arith.powmod(g, step, p)
+    k = start
+    for _ in range(0, count):
+        factors = _smooth_factorization(y, primes, product)
+        if factors is not None:
+            relations.append((k, factors))
+        y = y * t % p
+        k += step
+    return relations
+
+
+class IndexCalculus:
+    """
+    The index calculus method for discrete logarithms g^x = h in F_p*, for a fixed g and p.
+
+    The order n of g is factored. Its prime powers below ph_limit are handled by Pohlig-Hellman, which
+    is cheap for them. For every larger prime q dividing n (which must only divide it once) we find the
+    logarithms modulo q of all primes up to bound, the factor base, once in precompute():
+
+        - relations are collected: exponents k with g^k (mod p) smooth over the factor base, so
+          g^k = prod l_i^(e_i) and thus k = sum e_i log(l_i)  (mod q). This is spread over processes
+          worker processes.
+        - the sparse linear system of relations is solved modulo q by structured Gaussian elimination
+          followed by Wiedemann's algorithm (see linalg.solve_sparse).
+
+    After that, log(h) is a descent step: find k with h g^k smooth, and then
+    log(h) = sum e_i log(l_i) - k  (mod q).
+
+    The default bound is exp(0.7 sqrt(ln p ln ln p)). The textbook optimum has 0.5 rather than 0.7, but
+    here the smoothness test is cheap compared to the linear algebra, which favours a larger factor
+    base. There is a floor so that small p still get a useful factor base.
+    """
+
+    def __init__(
+        self,
+        g: int,
+        p: int,
+        bound: int = None,
+        processes: int = 1,
+        factors: Dict[int, int] = None,
+        ph_limit: int = 1 << 24,
+        seed: int = None,
+    ):
+        if p < 3:
+            raise ValueError("p must be an odd prime.")
+        if bound is None:
+            bound = max(100, int(exp(0.7 * sqrt(log(p) * log(log(p))))))
+        self.g, self.p, self.bound, self.processes = g % p, p, bound, processes
+        self._rng = Random(seed)
+
+        self.factors = factors if factors is not None else _factor_order(p - 1)
+        self.order = multiplicative_order(self.g, p, self.factors)
+        self.small, self.large = {}, []
+        for q in self.factors:
+            e = 0
+            while self.order % q ** (e + 1) == 0:
+                e += 1
+            if e == 0:
+                continue
+            if q**e <= ph_limit:
+                self.small[q] = e
+            elif e == 1:
+                self.large.append(q)
+            else:
+                raise ValueError(f"the order of g has a large prime power factor {q}^{e}.")
+
+        self.primes = [q for q in primes_up_to(bound) if p % q != 0]
+        # {q: {prime: log(prime) mod q}}, filled in by precompute().
+        self.logs: Dict[int, Dict[int, int]] = None
+        self._known: List[int] = None
+
+    def _relations(self, count: int) -> List[Tuple[int, Dict[int, int]]]:
+        """Collects at least count relations, from random starting exponents."""
+        chunk = 2000
+        relations = []
+        if self.processes <= 1:
+            while len(relations) < count:
+                start, step = self._rng.randrange(1, self.order), self._rng.randrange(1, self.order)
+                relations += _collect_relations(self.g, self.p, self.primes, start, step, chunk)
+            return relations
+
+        with ProcessPoolExecutor(self.processes) as pool:
+            while len(relations) < count:
+                jobs = [
+                    pool.submit(
+                        _collect_relations,
+                        self.g,
+                        self.p,
+                        self.primes,
+                        self._rng.randrange(1, self.order),
+                        self._rng.randrange(1, self.order),
+                        chunk,
+                    )
+                    for _ in range(0, 2 * self.processes)
+                ]
+                for job in jobs:
+                    relations += job.result()
+        return relations
+
+    def precompute(self):
+        """Finds the logarithms of the factor base modulo the large prime factors of the order."""
+        if self.logs is not None:
+            return
+        logs = {}
+        relations = []
+        for q in self.large:
+            while True:
+                need = len(self.primes) + 20 - len(relations)
+                if need > 0:
+                    relations += self._relations(need)
+                rows = [factors for _, factors in relations]
+                rhs = [k for k, _ in relations]
+                solution = solve_sparse(rows, rhs, q, self._rng)
+                if solution is not None:
+                    break
+                # Not enough independent relations.
+                relations += self._relations(len(self.primes) // 10 + 10)
+            logs[q] = solution
+
+        known = set(self.primes)
+        for solution in logs.values():
+            known &= set(solution)
+        self.logs = logs
+        self._known = sorted(known)
+
+    def log(self, h: int, max_tries: int = None) -> Union[None, int]:
+        """Solves g^x = h  (mod p). Returns the smallest solution x, or None if there is none."""
+        self.precompute()
+        g, p = self.g, self.p
+        h %= p
+        if h == 0:
+            return None
+
+        residues, moduli = [], []
+        for q, e in self.small.items():
+            x = _dlog_prime_power(g, h, p, self.order, q, e)
+            if x is None:
+                return None
+            residues.append(x)
+            moduli.append(q**e)
+
+        if self.large:
+            product = prod(self._known)
+            tries = 0
+            while True:
+                k = self._rng.randrange(0, self.order)
+                factors = _smooth_factorization(h * arith.powmod(g, k, p) % p, self._known, product)
+                if factors is not None:
+                    break
+                tries += 1
+                if max_tries is not None and tries >= max_tries:
+                    return None
+            for q in self.large:
+                logs = self.logs[q]
+                residues.append((sum(e * logs[l] for l, e in factors.items()) - k) % q)
+                moduli.append(q)
+
+        x, _ = crt(residues, moduli)
+        return x if arith.powmod(g, x, p) == h else None
+
+
+_INDEX_CALCULUS_CACHE: "OrderedDict[Tuple[int, int, int], IndexCalculus]" = OrderedDict()
+_INDEX_CALCULUS_CACHE_SIZE = 8
+
+
+def index_calculus(
+    g: int, h: int, p: int, bound: int = None, processes: int = 1
+) -> Union[None, int]:
+    """
+    Solves g^x = h  (mod p) with the index calculus method, see IndexCalculus. This is subexponential
+    in p, so unlike shanks and pollard_rho it is practical for large p, at least when p - 1 has a single
+    large prime factor (as for safe primes).
+
+    The precomputation for (g, p) is kept for the last few (g, p) used, so subsequent logarithms for
+    the same g and p only cost a descent step.
+
+    Returns the smallest solution x, or None if h is not a power of g.
+    """
+    key = (g % p, p, bound)
+    ic = _INDEX_CALCULUS_CACHE.get(key)
+    if ic is None:
+        ic = IndexCalculus(g, p, bound, processes)
+        ic.precompute()
+        _INDEX_CALCULUS_CACHE[key] = ic
+        if len(_INDEX_CALCULUS_CACHE) > _INDEX_CALCULUS_CACHE_SIZE:
+            _INDEX_CALCULUS_CACHE.popitem(last=False)
+    else:
+        _INDEX_CALCULUS_CACHE.move_to_end(key)
+    return ic.log(h)
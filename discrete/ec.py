@@ -0,0 +1,305 @@
+from dataclasses import dataclass
+from typing import Optional, Tuple, List, Iterable
+
+from . import arith
+
+# Points in affine coordinates are pairs (x, y), and the point at infinity (the identity) is None.
+Point = Optional[Tuple[int, int]]
+# Points in Jacobian coordinates (X, Y, Z) represent the affine point (X / Z^2, Y / Z^3). Any triple
+# with Z = 0 is the point at infinity.
+JacobianPoint = Tuple[int, int, int]
+
+INFINITY = None
+_JINFINITY = (1, 1, 0)
+
+
+def wnaf(k: int, w: int) -> List[int]:
+    """
+    The width-w non-adjacent form of k >= 0, least significant digit first. Every non-zero digit is odd
+    and |d| < 2^(w - 1), and any w consecutive digits contain at most one non-zero digit. So a scalar
+    multiplication needs about bits / (w + 1) additions, with only the odd multiples
+    P, 3P, ..., (2^(w - 1) - 1)P precomputed.
+
+    >>> wnaf(7, 2)
+    [-1, 0, 0, 1]
+    """
+    if w < 2:
+        raise ValueError("w must be at least 2.")
+    window, half = 1 << w, 1 << (w - 1)
+    digits = []
+    while k:
+        d = 0
+        if k & 1:
+            d = k & (window - 1)
+            if d >= half:
+                d -= window
+            k -= d
+        digits.append(d)
+        k >>= 1
+    return digits
+
+
+@dataclass(frozen=True)
+class Curve:
+    """
+    A short Weierstrass curve y^2 = x^3 + a x + b over F_p, p a prime > 3.
+
+    Single additions are done in affine coordinates, which costs a modular inversion each. Scalar
+    multiplication instead works in Jacobian coordinates, which avoids the inversions at the cost of a
+    few more multiplications, and converts back to affine once at the end. The precomputed multiples
+    are normalised to affine together with a single shared inversion (see affine_batch), so the main
+    loop uses the cheaper mixed Jacobian-affine addition.
+
+    G, n and h are the base point, its order and the cofactor, when known.
+    """
+
+    p: int
+    a: int
+    b: int
+    G: Point = None
+    n: int = None
+    h: int = 1
+    name: str = ""
+
+    def __post_init__(self):
+        if (4 * self.a**3 + 27 * self.b**2) % self.p == 0:
+            raise ValueError("the curve is singular.")
+
+    def contains(self, P: Point) -> bool:
+        if P is None:
+            return True
+        x, y = P
+        return (y * y - (x * x + self.a) * x - self.b) % self.p == 0
+
+    def neg(self, P: Point) -> Point:
+        if P is None:
+            return None
+        x, y = P
+        return x, -y % self.p
+
+    def add(self, P: Point, Q: Point) -> Point:
+        """P + Q in affine coordinates."""
+        if P is None:
+            return Q
+        if Q is None:
+            return P
+        p = self.p
+        (x1, y1), (x2, y2) = P, Q
+        if x1 == x2:
+            if (y1 + y2) % p == 0:
+                return None
+            # P = Q, the slope is that of the tangent.
+            s = (3 * x1 * x1 + self.a) * arith.invert(2 * y1, p) % p
+        else:
+            s = (y2 - y1) * arith.invert(x2 - x1, p) % p
+        x3 = (s * s - x1 - x2) % p
+        return x3, (s * (x1 - x3) - y1) % p
+
+    def double(self, P: Point) -> Point:
+        return self.add(P, P)
+
+    def jacobian(self, P: Point) -> JacobianPoint:
+        if P is None:
+            return _JINFINITY
+        return P[0], P[1], 1
+
+    def affine(self, J: JacobianPoint) -> Point:
+        X, Y, Z = J
+        if Z == 0:
+            return None
+        p = self.p
+        zinv = arith.invert(Z, p)
+        zinv2 = zinv * zinv % p
+        return X * zinv2 % p, Y * zinv2 * zinv % p
+
+    def affine_batch(self, Js: Iterable[JacobianPoint]) -> List[Point]:
+        """
+        Converts many Jacobian points to affine with one modular inversion in total (Montgomery's
+        trick). With z_1, ..., z_k and the running products c_i = z_1 ... z_i, we only invert c_k, and
+        then for i = k, ..., 1:
+
+            1 / z_i      = c_(i-1) / c_i
+            1 / c_(i-1)  = z_i / c_i
+        """
+        Js = list(Js)
+        p = self.p
+        prods = []
+        c = 1
+        for _, _, Z in Js:
+            if Z != 0:
+                c = c * Z % p
+            prods.append(c)
+
+        cinv = arith.invert(c, p)
+        res = [None] * len(Js)
+        for i in range(len(Js) - 1, -1, -1):
+            X, Y, Z = Js[i]
+            if Z == 0:
+                continue
+            zinv = cinv * (prods[i - 1] if i > 0 else 1) % p
+            cinv = cinv * Z % p
+            zinv2 = zinv * zinv % p
+            res[i] = X * zinv2 % p, Y * zinv2 * zinv % p
+        return res
+
+    def jdouble(self, J: JacobianPoint) -> JacobianPoint:
+        """2J in Jacobian coordinates."""
+        X, Y, Z = J
+        if Z == 0 or Y == 0:
+            return _JINFINITY
+        p = self.p
+        YY = Y * Y % p
+        S = 4 * X * YY % p
+        if self.a == 0:
+            M = 3 * X * X % p
+        else:
+            ZZ = Z * Z % p
+            M = (3 * X * X + self.a * ZZ * ZZ) % p
+        X3 = (M * M - 2 * S) % p
+        Y3 = (M * (S - X3) - 8 * YY * YY) % p
+        return X3, Y3, 2 * Y * Z % p
+
+    def jadd(self, J1: JacobianPoint, J2: JacobianPoint) -> JacobianPoint:
+        """J1 + J2 in Jacobian coordinates."""
+        X1, Y1, Z1 = J1
+        X2, Y2, Z2 = J2
+        if Z1 == 0:
+            return J2
+        if Z2 == 0:
+            return J1
+        p = self.p
+        Z1Z1, Z2Z2 = Z1 * Z1 % p, Z2 * Z2 % p
+        U1, U2 = X1 * Z2Z2 % p, X2 * Z1Z1 % p
+        S1, S2 = Y1 * Z2 * Z2Z2 % p, Y2 * Z1 * Z1Z1 % p
+        H, r = (U2 - U1) % p, (S2 - S1) % p
+        if H == 0:
+            return self.jdouble(J1) if r == 0 else _JINFINITY
+        HH = H * H % p
+        HHH = H * HH % p
+        V = U1 * HH % p
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - S1 * HHH) % p
+        return X3, Y3, Z1 * Z2 * H % p
+
+    def jmadd(self, J: JacobianPoint, P: Point) -> JacobianPoint:
+        """J + P for a Jacobian J and an affine P (mixed addition), cheaper than jadd."""
+        if P is None:
+            return J
+        X1, Y1, Z1 = J
+        if Z1 == 0:
+            return P[0], P[1], 1
+        p = self.p
+        x2, y2 = P
+        Z1Z1 = Z1 * Z1 % p
+        H = (x2 * Z1Z1 - X1) % p
+        r = (y2 * Z1 * Z1Z1 - Y1) % p
+        if H == 0:
+            return self.jdouble(J) if r == 0 else _JINFINITY
+        HH = H * H % p
+        HHH = H * HH % p
+        V = X1 * HH % p
+        X3 = (r * r - HHH - 2 * V) % p
+        Y3 = (r * (V - X3) - Y1 * HHH) % p
+        return X3, Y3, Z1 * H % p
+
+    def _odd_multiples(self, P: Point, w: int) -> List[JacobianPoint]:
+        """[P, 3P, 5P, ..., (2^(w - 1) - 1)P] in Jacobian coordinates."""
+        J = self.jacobian(P)
+        J2 = self.jdouble(J)
+        Js = [J]
+        for _ in range(1, 1 << (w - 2)):
+            Js.append(self.jadd(Js[-1], J2))
+        return Js
+
+    def _mul_jacobian(self, k: int, P: Point, w: int) -> JacobianPoint:
+        if k < 0:
+            k, P = -k, self.neg(P)
+        if k == 0 or P is None:
+            return _JINFINITY
+        table = self.affine_batch(self._odd_multiples(P, w))
+        negtable = [self.neg(Q) for Q in table]
+
+        R = _JINFINITY
+        for d in reversed(wnaf(k, w)):
+            R = self.jdouble(R)
+            if d > 0:
+                R = self.jmadd(R, table[d >> 1])
+            elif d < 0:
+                R = self.jmadd(R, negtable[-d >> 1])
+        return R
+
+    def mul(self, k: int, P: Point, w: int = 5) -> Point:
+        """
+        The scalar multiple kP, using width-w NAF. A window of w = 4 or 5 is best for 256-bit
+        scalars.
+        """
+        return self.affine(self._mul_jacobian(k, P, w))
+
+    def mul_many(self, ks: Iterable[int], P: Point, w: int = 5) -> List[Point]:
+        """[kP for k in ks], with a single shared inversion for all of them."""
+        return self.affine_batch(self._mul_jacobian(k, P, w) for k in ks)
+
+    def mul2(self, k: int, P: Point, l: int, Q: Point, w: int = 5) -> Point:
+        """
+        kP + lQ by Shamir's trick: both wNAF expansions are walked together so the doublings are
+        shared, which costs about as much as a single scalar multiplication. Useful for signature
+        verification, which is exactly this computation.
+        """
+        if k < 0:
+            k, P = -k, self.neg(P)
+        if l < 0:
+            l, Q = -l, self.neg(Q)
+        if k == 0 or P is None:
+            return self.mul(l, Q, w)
+        if l == 0 or Q is None:
+            return self.mul(k, P, w)
+
+        # One shared inversion for both tables.
+        both = self.affine_batch(self._odd_multiples(P, w) + self._odd_multiples(Q, w))
+        half = len(both) // 2
+        tables = [
+            (both[:half], [self.neg(T) for T in both[:half]]),
+            (both[half:], [self.neg(T) for T in both[half:]]),
+        ]
+
+        dk, dl = wnaf(k, w), wnaf(l, w)
+        length = max(len(dk), len(dl))
+        dk += [0] * (length - len(dk))
+        dl += [0] * (length - len(dl))
+
+        R = _JINFINITY
+        for i in range(length - 1, -1, -1):
+            R = self.jdouble(R)
+            for d, (pos, neg) in zip((dk[i], dl[i]), tables):
+                if d > 0:
+                    R = self.jmadd(R, pos[d >> 1])
+                elif d < 0:
+                    R = self.jmadd(R, neg[-d >> 1])
+        return self.affine(R)
+
+
+# SEC 2, Recommended Elliptic Curve Domain Parameters, version 2.0.
+SECP256K1 = Curve(
+    p=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEFFFFFC2F,
+    a=0,
+    b=7,
+    G=(
+        0x79BE667EF9DCBBAC55A06295CE870B07029BFCDB2DCE28D959F2815B16F81798,
+        0x483ADA7726A3C4655DA4FBFC0E1108A8FD17B448A68554199C47D08FFB10D4B8,
+    ),
+    n=0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141,
+    name="secp256k1",
+)
+
+# FIPS 186-4, D.1.2.3 (also known as secp256r1 and prime256v1).
+P256 = Curve(
+    p=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFF,
+    a=0xFFFFFFFF00000001000000000000000000000000FFFFFFFFFFFFFFFFFFFFFFFC,
+    b=0x5AC635D8AA3A93E7B3EBBD55769886BC651D06B0CC53B0F63BCE3C3E27D2604B,
+    G=(
+        0x6B17D1F2E12C4247F8BCE6E563A440F277037D812DEB33A0F4A13945D898C296,
+        0x4FE342E2FE1A7F9B8EE7EB4A7C0F9E162BCE33576B315ECECBB6406837BF51F5,
+    ),
+    n=0xFFFFFFFF00000000FFFFFFFFFFFFFFFFBCE6FAADA7179E84F3B9CAC2FC632551,
+    name="P-256",
+)
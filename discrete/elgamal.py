@@ -0,0 +1,111 @@
+from random import randint
+from typing import Tuple, List, Iterable
+from dataclasses import dataclass
+from .fixedbase import FixedBaseExp
+from . import arith
+
+
+@dataclass
+class PublicKey:
+    p: int
+    # Generator of F_p* (or of a large subgroup).
+    g: int
+    # A = g^a, where a is the private exponent.
+    A: int
+
+    def __str__(self) -> str:
+        return f"<PublicKey: p={self.p:x}, g={self.g}, A={self.A:x}>"
+
+
+@dataclass
+class PrivateKey:
+    p: int
+    # The private exponent a.
+    a: int
+
+    def __str__(self) -> str:
+        return f"<PrivateKey: p={self.p:x}, a={self.a}>"
+
+
+def generate_keys(g: int, p: int) -> Tuple[PrivateKey, PublicKey]:
+    """
+    Generates a key pair for the ElGamal system over F_p* with generator g. The private key is a random
+    exponent a and the public key is A = g^a (mod p).
+
+    The parameters are not checked, p should be a (large) prime and g a primitive root.
+    """
+    if p < 5:
+        raise ValueError("p must be at least 5.")
+    a = randint(2, p - 2)
+    return PrivateKey(p, a), PublicKey(p, g, arith.powmod(g, a, p))
+
+
+def encrypt(plaintext: int, public_key: PublicKey, k: int = None) -> Tuple[int, int]:
+    """
+    Encrypt plaintext (1 <= plaintext < p) using the ElGamal algorithm. An ephemeral exponent k is
+    picked at random unless given, and the ciphertext is the pair
+
+        (c1, c2) = (g^k, m A^k)  (mod p)
+
+    k must never be reused: anyone who knows one plaintext then knows A^k and so every other one.
+
+    Returns the ciphertext pair.
+    """
+    p = public_key.p
+    if k is None:
+        k = randint(2, p - 2)
+    return arith.powmod(public_key.g, k, p), plaintext * arith.powmod(public_key.A, k, p) % p
+
+
+def decrypt(ciphertext: Tuple[int, int], private_key: PrivateKey) -> int:
+    """
+    Decrypts a ciphertext pair (c1, c2) using the private key. Since c1^a = g^(ka) = A^k we recover the
+    plaintext as c2 (c1^a)^-1. The inverse is computed as c1^(p - 1 - a) by Fermat's little theorem.
+
+    Returns the plaintext.
+    """
+    c1, c2 = ciphertext
+    p = private_key.p
+    return c2 * arith.powmod(c1, p - 1 - private_key.a, p) % p
+
+
+class Encryptor:
+    """
+    Encrypts many messages to the same public key. Both exponentiations in encrypt() have fixed
+    bases, g and A, so each gets a FixedBaseExp table. Building the tables costs about as much as a
+    few dozen plain encryptions, after which each encryption is only lookups and multiplications.
+    """
+
+    def __init__(self, public_key: PublicKey, window: int = 4):
+        self.public_key = public_key
+        p = public_key.p
+        self._gexp = FixedBaseExp(public_key.g, p, window=window)
+        self._Aexp = FixedBaseExp(public_key.A, p, window=window)
+
+    def encrypt(self, plaintext: int, k: int = None) -> Tuple[int, int]:
+        """Same as encrypt(plaintext, public_key, k)."""
+        p = self.public_key.p
+        if k is None:
+            k = randint(2, p - 2)
+        return self._gexp(k), plaintext * self._Aexp(k) % p
+
+    def encrypt_batch(self, plaintexts: Iterable[int]) -> List[Tuple[int, int]]:
+        """Encrypts every plaintext, each with its own random k."""
+        return [self.encrypt(m) for m in plaintexts]
+
+
+def encrypt_batch(
+    plaintexts: Iterable[int], public_key: PublicKey, window: int = 4
+) -> List[Tuple[int, int]]:
+    """
+    Encrypts every plaintext to public_key, see encrypt(). The fixed-base tables are built once for
+    the whole batch, so this is much quicker than calling encrypt() in a loop for large batches.
+    """
+    return Encryptor(public_key, window).encrypt_batch(plaintexts)
+
+
+def decrypt_batch(
+    ciphertexts: Iterable[Tuple[int, int]], private_key: PrivateKey
+) -> List[int]:
+    """Decrypts every ciphertext pair, see decrypt()."""
+    return [decrypt(c, private_key) for c in ciphertexts]
@@ -92,3 +92,34 @@ def extended(a: SupportsInt, b: SupportsInt) -> Union[Tuple[int, int, int], None
         d, u, v = -d, -u, -v
 
     return d, u, v
+
+
+def crt(residues: List[int], moduli: List[int]) -> Union[Tuple[int, int], None]:
+    """
+    The Chinese Remainder Theorem. Finds x such that
+
+        x = r_i  (mod m_i)
+
+    for every pair of residue r_i and modulus m_i. The moduli do not have to be pairwise coprime, but
+    then the congruences might contradict each other.
+
+    Returns (x, m) where m is the least common multiple of the moduli and 0 <= x < m, so that the
+    solutions are exactly x + k m. Returns None if there is no solution.
+
+    >>> crt([2, 3, 2], [3, 5, 7])
+    (23, 105)
+    """
+    if len(residues) != len(moduli):
+        raise ValueError("there must be as many residues as moduli.")
+    x, m = 0, 1
+    for r, n in zip(residues, moduli):
+        if n < 1:
+            raise ValueError("moduli must be positive.")
+        # x + m t = r  (mod n), so m t = r - x  (mod n), which is solvable iff gcd(m, n) | r - x.
+        d, u, _ = extended(m, n)
+        if (r - x) % d != 0:
+            return None
+        t = (r - x) // d * u % (n // d)
+        x, m = x + m * t, m // d * n
+        x %= m
+    return x, m
@@ -1,8 +1,21 @@
-from typing import Union
-from .euclidean import extended as egcd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from math import prod
+from random import Random
+from typing import Union, List, Iterable, Dict, Tuple
 
+from . import arith
+from .cache import Cache, cached
+from .ec import Curve, Point, JacobianPoint, wnaf
+from .sieve import primes_up_to
 
-def pollardpmin1(n: int, max_factorial: int = 100, a: int = 2) -> Union[None, int]:
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def pollardpmin1(n: int, max_factorial: int = 100, a: int = 2, cache: Cache = None) -> Union[None, int]:
     """Tries to find a factor of n by Pollard's p - 1 method. This can be an effective
     algorithm for composite numbers like pq where p and q are prime, and p - 1 or q - 1
     consists of small primes factors.
@@ -13,6 +26,9 @@ def pollardpmin1(n: int, max_factorial: int = 100, a: int = 2) -> Union[None, in
 
     If no factor is found within the bounds given, returns None.
 
+    With a cache (see discrete.cache) the result for these n, max_factorial and a is looked up there
+    first, and stored there afterwards.
+
     Note: 
         factorial is calculated modulo n, so it should be viewed more as an iteration 
         count.
@@ -26,7 +42,10 @@ def pollardpmin1(n: int, max_factorial: int = 100, a: int = 2) -> Union[None, in
 
     if max_factorial < 0:
         raise ValueError("max_factorial must be 0 or greater.")
+    return cached(cache, "pminus1", (n, max_factorial, a), lambda: _pollardpmin1(n, max_factorial, a))
+
 
+def _pollardpmin1(n: int, max_factorial: int, a: int) -> Union[None, int]:
     # The main idea:
     #   Assume n = p q, p some prime.
     #   Now if p - 1 factors as "small primes", then it should divide a reasonably small k!
@@ -41,10 +60,569 @@ def pollardpmin1(n: int, max_factorial: int = 100, a: int = 2) -> Union[None, in
 
     a_ = a
     for i in range(1, max_factorial+1):
-        a_ = pow(a_, i, n)
-        d, _, _ = egcd(a_ - 1, n)
+        a_ = arith.powmod(a_, i, n)
+        d = arith.gcd(a_ - 1, n)
         if d != 1:
             return d
     
     return None
 
+
+def _lucas(v: int, k: int, n: int) -> int:
+    """
+    V_k modulo n for the Lucas sequence V_0 = 2, V_1 = v, V_(i+1) = v V_i - V_(i-1), k >= 1. A ladder
+    on the pair (V_i, V_(i+1)), using V_2i = V_i^2 - 2 and V_(2i+1) = V_i V_(i+1) - v.
+    """
+    x, y = v, (v * v - 2) % n
+    for bit in bin(k)[3:]:
+        if bit == "1":
+            x, y = (x * y - v) % n, (y * y - 2) % n
+        else:
+            x, y = (x * x - 2) % n, (x * y - v) % n
+    return x
+
+
+def williams_pplus1(
+    n: int, B1: int = 10000, B2: int = None, seeds: Iterable[int] = (3, 4, 5, 6, 9), processes: int = 1
+) -> Union[None, int]:
+    """
+    Tries to find a factor of n by Williams' p + 1 method, which does for primes p with p + 1 smooth
+    what pollardpmin1() does for p - 1 smooth.
+
+    Lucas sequences V_k = a^k + a^(-k), with a a root of x^2 - v x + 1, live in F_p* if v^2 - 4 is a
+    square modulo p, and in the subgroup of order p + 1 of F_(p^2)* otherwise. In the second case
+    V_M = 2 (mod p) whenever p + 1 divides M, so gcd(V_M - 2, n) finds p just like p - 1 does in
+    Pollard's method. Whether v^2 - 4 is a square is down to luck, which is why several seeds v are
+    tried (any one of them that hits a square still makes it a p - 1 method).
+
+    Stage 1 takes M the product of all prime powers up to B1. Stage 2 (up to B2, by default 100 B1)
+    allows one more prime q, which it finds as q = kD +- j: a^(M q) = 1 means that V_(M kD) - V_(M j)
+    = 0 (mod p), so the product of these differences over all such q has p in its gcd with n.
+
+    The seeds are run on a pool of processes if processes > 1, first factor wins. Returns a factor
+    1 < f < n, or None.
+    """
+    n = abs(int(n))
+    if B1 < 1:
+        raise ValueError("B1 must be at least 1.")
+    if B2 is None:
+        B2 = 100 * B1
+    if B2 < B1:
+        raise ValueError("B2 must be at least B1.")
+    if n < 4:
+        return None
+    if n % 2 == 0:
+        return 2
+
+    seeds = list(seeds)
+    if processes <= 1:
+        for v in seeds:
+            f = _pplus1(n, B1, B2, v)
+            if f is not None:
+                return f
+        return None
+
+    pool = ProcessPoolExecutor(min(processes, len(seeds)))
+    try:
+        futures = [pool.submit(_pplus1, n, B1, B2, v) for v in seeds]
+        for future in as_completed(futures):
+            f = future.result()
+            if f is not None:
+                return f
+        return None
+    finally:
+        # The seeds still running can not be stopped, but there is no need to wait for them.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pplus1(n: int, B1: int, B2: int, v: int, batch: int = 64) -> Union[None, int]:
+    """One seed of williams_pplus1()."""
+    primes = primes_up_to(B2)
+
+    # Stage 1. gcd() only every batch primes; if that gives n several factors were found in one go, so
+    # go back to the last checkpoint and take it a prime at a time.
+    stage1 = [q for q in primes if q <= B1]
+    V = v % n
+    for start in range(0, len(stage1), batch):
+        checkpoint = V
+        for q in stage1[start : start + batch]:
+            V = _lucas(V, _prime_power(q, B1), n)
+        d = arith.gcd(V - 2, n)
+        if d == n:
+            V = checkpoint
+            for q in stage1[start : start + batch]:
+                V = _lucas(V, _prime_power(q, B1), n)
+                d = arith.gcd(V - 2, n)
+                if d != 1:
+                    break
+        if d == n:
+            return None
+        if d != 1:
+            return d
+
+    # Stage 2, with W = V_M. Every prime B1 < q <= B2 is kD +- j with 0 < j < D / 2 and gcd(j, D) = 1.
+    stage2 = [q for q in primes if q > B1]
+    if not stage2:
+        return None
+    D = 2310
+    W = V
+    # V_j(W) for the odd j < D / 2, from V_(j+2) = V_j V_2 - V_(j-2).
+    W2 = (W * W - 2) % n
+    Vj = {1: W, 3: _lucas(W, 3, n)}
+    for j in range(5, D // 2, 2):
+        Vj[j] = (Vj[j - 2] * W2 - Vj[j - 4]) % n
+    WD = _lucas(W, D, n)
+
+    k = (stage2[0] + D // 2) // D
+    # V_(kD)(W) and V_((k-1)D)(W), stepped by V_((k+1)D) = V_(kD) V_D - V_((k-1)D).
+    # V_0 = 2 and V_(-D) = V_D.
+    VkD = _lucas(W, k * D, n) if k > 0 else 2
+    Vprev = _lucas(W, (k - 1) * D, n) if k > 1 else (2 if k == 1 else WD)
+    product, terms = 1, []
+    i = 0
+    while i < len(stage2):
+        while i < len(stage2) and stage2[i] <= k * D + D // 2:
+            j = abs(stage2[i] - k * D)
+            terms.append(VkD - Vj[j])
+            product = product * (VkD - Vj[j]) % n
+            i += 1
+        if len(terms) >= batch or i == len(stage2):
+            d = arith.gcd(product, n)
+            if d == n:
+                d = next((f for f in (arith.gcd(t, n) for t in terms) if f not in (1, n)), n)
+            if d not in (1, n):
+                return d
+            product, terms = 1, []
+        VkD, Vprev = (VkD * WD - Vprev) % n, VkD
+        k += 1
+    return None
+
+
+def _prime_power(q: int, bound: int) -> int:
+    """The largest power of q that is at most bound."""
+    e = q
+    while e * q <= bound:
+        e *= q
+    return e
+
+
+def ecm(
+    n: int, B1: int = 2000, B2: int = None, curves: int = 100, seed: int = None
+) -> Union[None, int]:
+    """
+    Tries to find a factor of n by Lenstra's elliptic curve method. Where pollardpmin1() needs p - 1
+    to be smooth, here it is enough that one of many random curves has a smooth number of points
+    modulo p, and that number is anywhere in p + 1 +- 2 sqrt(p). So unlike the other methods this
+    finds any factor sooner or later, and the time it takes depends mostly on the size of the factor
+    rather than that of n.
+
+    For each curve y^2 = x^3 + a x + b through a random point P (modulo n, which is as good as modulo
+    every prime factor p of n at once), stage 1 computes M P with M the product of all prime powers up
+    to B1. If the order of P modulo p divides M, M P is the identity modulo p, so its Z coordinate is
+    0 modulo p and gcd(Z, n) finds p. Stage 2 (up to B2, by default 100 B1) allows the order one more
+    prime q, found as q = kD +- j like in williams_pplus1().
+
+    The curves are Suyama's, whose orders are all divisible by 12. With the default B2 a factor of 13
+    digits (2^44) takes about 12 curves with B1 = 2000, one of 15 digits (2^50) about 6 with
+    B1 = 11000, and one of 20 digits (2^64) a few tens with B1 = 25000 to 50000. For an n of 128 bits
+    a curve takes about B1 / 30000 seconds. Returns a factor 1 < f < n, or None.
+    """
+    n = abs(int(n))
+    if B1 < 1:
+        raise ValueError("B1 must be at least 1.")
+    if B2 is None:
+        B2 = 100 * B1
+    if B2 < B1:
+        raise ValueError("B2 must be at least B1.")
+    if n < 4:
+        return None
+    for q in (2, 3):
+        if n % q == 0:
+            return q
+    # A prime has nothing to find, and below 8 there are not enough parameters for Suyama's curves.
+    if n < 8 or arith.is_probable_prime(n):
+        return None
+
+    digits = _ecm_multiplier(B1)
+    stage2 = [q for q in primes_up_to(B2) if q > B1] if B2 > B1 else []
+    rng = Random(seed)
+    for _ in range(0, curves):
+        f = _ecm_curve(n, digits, stage2, rng)
+        if f is not None:
+            return f
+    return None
+
+
+@lru_cache(maxsize=8)
+def _ecm_multiplier(B1: int) -> Tuple[int, ...]:
+    """The NAF digits of the stage 1 multiplier of ecm(), most significant first."""
+    M = prod(_prime_power(q, B1) for q in primes_up_to(B1))
+    return tuple(reversed(wnaf(M, 2)))
+
+
+def _ecm_mul(curve: Curve, digits: Iterable[int], P: Point) -> JacobianPoint:
+    """
+    The multiple of P with these NAF digits, by doublings and mixed additions only. Curve.mul()
+    inverts for its table and at the end, which modulo a composite may fail.
+    """
+    double, madd = curve.jdouble, curve.jmadd
+    negP = curve.neg(P)
+    R = curve.jacobian(None)
+    for d in digits:
+        R = double(R)
+        if d > 0:
+            R = madd(R, P)
+        elif d < 0:
+            R = madd(R, negP)
+    return R
+
+
+def _ecm_curve(n: int, digits: Tuple[int, ...], stage2: List[int], rng: Random) -> Union[None, int]:
+    """One curve of ecm(), for n not divisible by 2 or 3."""
+    # Suyama's curves B y^2 = x^3 + A x^2 + x have 12 points over Q, so their orders modulo p are
+    # divisible by 12, which makes them a good deal more likely to be smooth than those of random
+    # curves. sigma gives A and a point with x = u^3 / v^3, and B is picked to make y = 1. Any
+    # denominator that is not invertible has a factor of n in common with it.
+    sigma = rng.randrange(6, n - 1)
+    u, v = (sigma * sigma - 5) % n, 4 * sigma % n
+    d = arith.gcd(u * v, n)
+    if d != 1:
+        return d if d < n else None
+    x = u**3 * arith.invert(v**3, n) % n
+    A = ((v - u) ** 3 * (3 * u + v) * arith.invert(4 * u**3 * v, n) - 2) % n
+    B = ((x + A) * x + 1) * x % n
+    d = arith.gcd(B * (A * A - 4), n)
+    if d != 1:
+        return d if d < n else None
+
+    # The same curve in short Weierstrass form, with x = B X - A / 3 and y = B Y. Curve expects a
+    # prime, but its Jacobian formulas never invert, so they work modulo n too. Once the point is the
+    # identity modulo p its Z stays 0 modulo p.
+    Binv, inv3 = arith.invert(B, n), arith.invert(3, n)
+    a = (3 - A * A) * inv3 * Binv * Binv % n
+    b = (2 * A**3 - 9 * A) * inv3**3 * Binv**3 % n
+    curve = Curve(n, a, b)
+    P = ((x + A * inv3) * Binv % n, Binv)
+    J = _ecm_mul(curve, digits, P)
+    d = arith.gcd(J[2], n)
+    if d != 1:
+        # n means the point is the identity modulo every factor at once, this curve is no use.
+        return d if d < n else None
+    if not stage2:
+        return None
+
+    # Stage 2. With Q = M P and q = kD +- j, q Q = 0 means kD Q = -+j Q, which have the same x
+    # coordinate: X_k / Z_k^2 = x_j, so X_k - x_j Z_k^2 = 0 (mod p) for the Jacobian (X_k, Y_k, Z_k).
+    D = 2310
+    Q = curve.affine(J)
+    # j Q for the odd j <= D / 2 and then D Q, all made affine with one shared inversion.
+    Q2 = curve.jdouble(curve.jacobian(Q))
+    Js = [curve.jacobian(Q)]
+    for _ in range(1, (D // 2 + 1) // 2):
+        Js.append(curve.jadd(Js[-1], Q2))
+    Js.append(curve.jdouble(Js[-1]))
+    zs = 1
+    for _, _, Z in Js:
+        zs = zs * Z % n
+    d = arith.gcd(zs, n)
+    if d != 1:
+        return d if d < n else None
+    points = curve.affine_batch(Js)
+    xs, DQ = [x for x, _ in points[:-1]], points[-1]
+
+    k = (stage2[0] + D // 2) // D
+    X, _, Z = G = _ecm_mul(curve, reversed(wnaf(k * D, 2)), Q)
+    ZZ = Z * Z % n
+    product = 1
+    for q in stage2:
+        while q > k * D + D // 2:
+            X, _, Z = G = curve.jmadd(G, DQ)
+            ZZ = Z * Z % n
+            k += 1
+        product = product * (X - xs[abs(q - k * D) >> 1] * ZZ) % n
+    d = arith.gcd(product, n)
+    return d if 1 < d < n else None
+
+
+# Pairwise coprime moduli for ruling out a^2 - n that can not be squares. Only about 1 in 150 values of
+# a passes all of them.
+_FERMAT_MODULI = (64, 63, 65, 11)
+
+
+def _fermat_filter(n: int, m: int) -> List[bool]:
+    """For each a mod m, whether a^2 - n is a square modulo m."""
+    squares = set(x * x % m for x in range(0, m))
+    return [(a * a - n) % m in squares for a in range(0, m)]
+
+
+def fermat(n: int, max_steps: int = 1 << 20, vectorize: bool = None) -> Union[None, int]:
+    """
+    Tries to factor n by Fermat's method: looks for a such that a^2 - n = b^2 is a square, and then
+    n = (a - b)(a + b). Starting from a = ceil(sqrt(n)) this takes (p + q)/2 - sqrt(n) steps for n = pq,
+    about (p - q)^2 / (8 sqrt(n)), so it finds p and q at once when they are close, which happens if
+    both are picked from a narrow range (as generate_keys() does). Useless otherwise.
+
+    Most a can be ruled out without the square root, since a^2 - n has to be a square modulo 64, 63,
+    65 and 11 as well. The values of a that pass are worked out once modulo 64 * 63 * 65 * 11 =
+    2882880, and only those get an isqrt(). With vectorize (the default when numpy is installed) the
+    filters are applied instead to blocks of a at a time with numpy.
+
+    Tries max_steps values of a. Returns a factor if found (the smaller one, 1 < f <= sqrt(n)), or None.
+    """
+    n = abs(int(n))
+    if max_steps < 0:
+        raise ValueError("max_steps must be 0 or greater.")
+    if n < 4:
+        return None
+    if n % 2 == 0:
+        # n = 2 (mod 4) is never a difference of squares.
+        return 2
+
+    a = arith.isqrt(n)
+    if a * a == n:
+        return a
+    a += 1
+    # Past (n + 1) / 2 there is only n = n * 1.
+    stop = min(a + max_steps, (n + 1) // 2)
+
+    if vectorize is None:
+        vectorize = np is not None
+    if vectorize:
+        if np is None:
+            raise ValueError("vectorize needs numpy.")
+        return _fermat_numpy(n, a, stop)
+    return _fermat_python(n, a, stop)
+
+
+def _fermat_check(n: int, a: int) -> Union[None, int]:
+    b2 = a * a - n
+    b = arith.isqrt(b2)
+    if b * b == b2:
+        return a - b
+    return None
+
+
+def _fermat_python(n: int, a: int, stop: int) -> Union[None, int]:
+    # Combine the residues a mod m that pass each filter into the ones mod L = prod(m) that pass them
+    # all, by the Chinese remainder theorem.
+    residues, L = [0], 1
+    for m in _FERMAT_MODULI:
+        allowed = [r for r, ok in enumerate(_fermat_filter(n, m)) if ok]
+        # x = r (mod L) and x = s (mod m) gives x = r + L ((s - r) / L mod m).
+        inv = arith.invert(L, m)
+        residues = [r + L * ((s - r) * inv % m) for r in residues for s in allowed]
+        L *= m
+    residues.sort()
+
+    base = a - a % L
+    while base < stop:
+        for r in residues:
+            x = base + r
+            if x < a:
+                continue
+            if x >= stop:
+                return None
+            f = _fermat_check(n, x)
+            if f is not None:
+                return f
+        base += L
+    return None
+
+
+def _fermat_numpy(n: int, a: int, stop: int, block: int = 1 << 16) -> Union[None, int]:
+    filters = [(m, np.array(_fermat_filter(n, m), dtype=bool)) for m in _FERMAT_MODULI]
+    offsets = np.arange(block, dtype=np.int64)
+    for start in range(a, stop, block):
+        count = min(block, stop - start)
+        mask = np.ones(count, dtype=bool)
+        for m, ok in filters:
+            mask &= ok[(offsets[:count] + start % m) % m]
+        for i in np.flatnonzero(mask):
+            f = _fermat_check(n, start + int(i))
+            if f is not None:
+                return f
+    return None
+
+
+def pollard_rho(n: int, max_iter: int = 1 << 20, c: int = 1, x0: int = 2) -> Union[None, int]:
+    """
+    Tries to find a factor of n by Pollard's rho method. The sequence x_(i+1) = x_i^2 + c (mod n) is
+    random enough that modulo a prime p | n it repeats after about sqrt(p) steps, and then
+    gcd(x_i - x_j, n) picks out p.
+
+    Cycles are found with Brent's method, and the differences are multiplied together so that there is
+    only one gcd per 128 steps; if that overshoots to n the last batch is redone a step at a time.
+
+    Takes at most max_iter steps. Returns a factor 1 < f < n, or None (try another c then).
+    """
+    n = abs(int(n))
+    if n < 4:
+        return None
+    if n % 2 == 0:
+        return 2
+
+    y, power, steps = x0 % n, 1, 0
+    while steps < max_iter:
+        # x is y at the last power of two, y walks on for power steps.
+        x = y
+        for first in range(0, power, 128):
+            saved = y
+            product = 1
+            for _ in range(first, min(first + 128, power)):
+                y = (y * y + c) % n
+                product = product * (x - y) % n
+            steps += min(128, power - first)
+            d = arith.gcd(product, n)
+            if d == n:
+                # Every prime factor showed up in the same batch (or n is a prime).
+                y = saved
+                for _ in range(first, min(first + 128, power)):
+                    y = (y * y + c) % n
+                    d = arith.gcd(x - y, n)
+                    if d != 1:
+                        break
+                return d if d != n else None
+            if d != 1:
+                return d
+            if steps >= max_iter:
+                return None
+        power *= 2
+    return None
+
+
+# factorint() divides out the primes below this first.
+_TRIAL_BOUND = 1 << 16
+
+
+def factorint(
+    n: int, max_rho: int = 1 << 18, max_curves: int = 500, partial: bool = False
+) -> Dict[int, int]:
+    """
+    The prime factorisation of n > 0 as {prime: exponent}, in increasing order of the primes.
+
+    Cheap methods go first, since most numbers have mostly small factors:
+
+        - trial division by the primes below 2^16, after which a cofactor below 2^32 is a prime,
+        - a probable prime test (arith.is_probable_prime) for each cofactor,
+        - checking if it is a perfect power,
+        - a short run each of fermat(), pollardpmin1() and williams_pplus1(), which find special factors
+          cheaply,
+        - Pollard's rho with longer and longer runs (and other c), up to max_rho steps in all, which
+          finds the factors up to about 2^34,
+        - ecm() with larger and larger B1 (see _ECM_LEVELS), up to max_curves curves in all, for the
+          factors rho is too slow for. That finds factors of up to 20 digits (2^64) in under a minute,
+          so numbers of up to 128 bits factor.
+
+    Each factor found is factored the same way. Factorisations of the cofactors are memoized, so
+    factoring many numbers with common factors (p - 1 for many primes p, say) repeats no work.
+
+    Raises ValueError if some cofactor is still not factored after all that. With partial, such a
+    cofactor is instead left in the result as it is, with its exponent, so the keys are then not
+    necessarily primes (check them with arith.is_probable_prime()).
+    """
+    n = int(n)
+    if n < 1:
+        raise ValueError("n must be positive.")
+
+    factors = {}
+    for q in primes_up_to(_TRIAL_BOUND):
+        if q * q > n:
+            break
+        if n % q == 0:
+            e = 0
+            while n % q == 0:
+                n //= q
+                e += 1
+            factors[q] = e
+    if n > 1:
+        for q, e in _factor_large(n, max_rho, max_curves, partial):
+            factors[q] = factors.get(q, 0) + e
+    return dict(sorted(factors.items()))
+
+
+@lru_cache(maxsize=4096)
+def _factor_large(n: int, max_rho: int, max_curves: int, partial: bool) -> Tuple[Tuple[int, int], ...]:
+    """factorint() of an n > 1 with no prime factors below _TRIAL_BOUND, as sorted (prime, exponent)."""
+    if n < _TRIAL_BOUND * _TRIAL_BOUND or arith.is_probable_prime(n):
+        return ((n, 1),)
+
+    power = _perfect_power(n)
+    if power is not None:
+        r, k = power
+        return tuple((q, e * k) for q, e in _factor_large(r, max_rho, max_curves, partial))
+
+    d = _split(n, max_rho, max_curves)
+    if d is None:
+        if partial:
+            return ((n, 1),)
+        raise ValueError(f"could not factor {n} with {max_rho} steps of rho and {max_curves} curves.")
+    factors = dict(_factor_large(d, max_rho, max_curves, partial))
+    for q, e in _factor_large(n // d, max_rho, max_curves, partial):
+        factors[q] = factors.get(q, 0) + e
+    return tuple(sorted(factors.items()))
+
+
+def _iroot(n: int, k: int) -> int:
+    """The largest r with r^k <= n, by Newton's method."""
+    r = 1 << -(-n.bit_length() // k)
+    while True:
+        s = ((k - 1) * r + n // r ** (k - 1)) // k
+        if s >= r:
+            return r
+        r = s
+
+
+def _perfect_power(n: int) -> Union[None, Tuple[int, int]]:
+    """(r, k) with n = r^k, k > 1 as large as possible, or None. n has no factors below _TRIAL_BOUND."""
+    best = None
+    # r >= _TRIAL_BOUND = 2^16, so k <= log2(n) / 16. Prime k are enough, larger powers are found
+    # again in r.
+    for k in primes_up_to(n.bit_length() // 16):
+        r = arith.isqrt(n) if k == 2 else _iroot(n, k)
+        if r**k == n:
+            best = (r, k)
+    if best is not None:
+        r, k = best
+        inner = _perfect_power(r)
+        if inner is not None:
+            return inner[0], inner[1] * k
+    return best
+
+
+# ecm() in factorint() runs with these B1 and numbers of curves in turn, for factors of up to about 13,
+# 17 and 20 digits. The last one is repeated until max_curves.
+_ECM_LEVELS = ((2000, 25), (11000, 90), (50000, 300))
+
+
+def _split(n: int, max_rho: int, max_curves: int) -> Union[None, int]:
+    """A factor 1 < d < n of a composite n that is not a perfect power, or None."""
+    cheap = (
+        lambda: fermat(n, 1 << 12, vectorize=False),
+        lambda: pollardpmin1(n, 2000),
+        lambda: williams_pplus1(n, 2000, 50000, seeds=(3, 5)),
+    )
+    for method in cheap:
+        d = method()
+        if d is not None and 1 < d < n:
+            return d
+
+    steps, budget, c = 0, 1 << 14, 1
+    while steps < max_rho:
+        budget = min(budget, max_rho - steps)
+        d = pollard_rho(n, budget, c)
+        if d is not None and 1 < d < n:
+            return d
+        steps += budget
+        budget *= 2
+        c += 1
+
+    level = 0
+    while max_curves > 0:
+        B1, curves = _ECM_LEVELS[min(level, len(_ECM_LEVELS) - 1)]
+        curves = min(curves, max_curves)
+        d = ecm(n, B1, curves=curves)
+        if d is not None:
+            return d
+        max_curves -= curves
+        level += 1
+    return None
@@ -0,0 +1,97 @@
+from dataclasses import dataclass
+from typing import Any, Hashable, Protocol
+
+from .ec import Curve
+from . import arith
+
+
+class Group(Protocol):
+    """
+    What the generic discrete log algorithms need to know about a finite cyclic group (or a group with a
+    cyclic subgroup we work in):
+
+        identity        the neutral element
+        order           a multiple of the order of every element we use, typically the exact order of
+                        the (sub)group. Exponents are reduced modulo this.
+        op(a, b)        the group operation
+        exp(a, k)       a^k (or kP written additively), k may be negative
+        encode(a)       a hashable canonical form of a. Equal elements must have equal encodings, so
+                        these are used as dictionary keys and to decide equality.
+
+    Elements themselves can be of any type.
+    """
+
+    identity: Any
+    order: int
+
+    def op(self, a: Any, b: Any) -> Any:
+        ...
+
+    def exp(self, a: Any, k: int) -> Any:
+        ...
+
+    def encode(self, a: Any) -> Hashable:
+        ...
+
+
+@dataclass(frozen=True)
+class MultiplicativeGroup:
+    """
+    The multiplicative group F_p* (p a prime), or a subgroup of it. By default the order is p - 1, but
+    when the elements are known to lie in a subgroup of order q, passing order=q makes the algorithms
+    work modulo q. For Pollard's rho this means about sqrt(q) rather than sqrt(p) iterations.
+
+    Note that exp() reduces the exponent modulo the order, so passing a smaller order than the actual
+    order of the elements gives wrong results.
+    """
+
+    p: int
+    order: int = None
+
+    def __post_init__(self):
+        if self.order is None:
+            object.__setattr__(self, "order", self.p - 1)
+
+    @property
+    def identity(self) -> int:
+        return 1
+
+    def op(self, a: int, b: int) -> int:
+        return a * b % self.p
+
+    def exp(self, a: int, k: int) -> int:
+        return arith.powmod(a, k % self.order, self.p)
+
+    def encode(self, a: int) -> int:
+        return a % self.p
+
+
+@dataclass(frozen=True)
+class ECGroup:
+    """
+    The group of points on an elliptic curve, written multiplicatively for the sake of the Group
+    protocol: op is point addition and exp is scalar multiplication. The order defaults to the order n
+    of the curve's base point.
+    """
+
+    curve: Curve
+    order: int = None
+
+    def __post_init__(self):
+        if self.order is None:
+            if self.curve.n is None:
+                raise ValueError("the curve has no known order, it has to be given.")
+            object.__setattr__(self, "order", self.curve.n)
+
+    @property
+    def identity(self):
+        return None
+
+    def op(self, a, b):
+        return self.curve.add(a, b)
+
+    def exp(self, a, k: int):
+        return self.curve.mul(k % self.order, a)
+
+    def encode(self, a) -> Hashable:
+        return a
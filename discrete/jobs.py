@@ -0,0 +1,180 @@
+"""
+Batch jobs for the command line runner (python -m discrete run). A job is one JSON object per line,
+for example
+
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699}
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699, "method": "rho"}
+    {"op": "dlog", "g": 5, "h": 1234, "p": 2901564767, "method": "index_calculus"}
+    {"op": "dlog", "g": 3, "h": 1234, "p": 2901564767, "method": "kangaroo", "lo": 0, "hi": 1000000}
+    {"op": "factor", "n": 1403, "method": "pminus1", "bound": 100}
+    {"op": "factor", "n": 10403, "method": "fermat", "max_steps": 1000}
+    {"op": "factor", "n": 10403, "method": "pplus1", "B1": 100, "B2": 10000}
+    {"op": "isprime", "n": 561}
+
+Integers can also be given as strings, in any base Python understands ("0x1f", "31"). Any "id" in the
+job is copied to its result. Each result is one JSON object per line too, with "line" set to the line
+number of the job, and either the answer ("x", "factor", "prime") or "error".
+"""
+import json
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from typing import Iterable, TextIO, Callable, Dict, Any
+
+from .shanks import shanks
+from .dlp import pollard_rho, pohlig_hellman, index_calculus, kangaroo
+from .factor import pollardpmin1, fermat, williams_pplus1
+from .primality import miller_rabin_test, miller_rabin_samples
+
+
+class JobError(Exception):
+    pass
+
+
+def _int(job: dict, key: str, default: int = None) -> int:
+    if key not in job:
+        if default is None:
+            raise JobError(f"missing field {key!r}.")
+        return default
+    v = job[key]
+    try:
+        return v if isinstance(v, int) else int(v, 0)
+    except (TypeError, ValueError):
+        raise JobError(f"field {key!r} is not an integer.")
+
+
+def _dlog(job: dict) -> dict:
+    g, h, p = _int(job, "g"), _int(job, "h"), _int(job, "p")
+    method = job.get("method", "shanks")
+    if method == "shanks":
+        return {"x": shanks(g, h, p)}
+    elif method == "rho":
+        return {"x": pollard_rho(g, h, p)}
+    elif method == "pohlig_hellman":
+        return {"x": pohlig_hellman(g, h, p)}
+    elif method == "index_calculus":
+        return {"x": index_calculus(g, h, p)}
+    elif method == "kangaroo":
+        return {"x": kangaroo(g, h, p, _int(job, "lo"), _int(job, "hi"))}
+    raise JobError(f"unknown dlog method {method!r}.")
+
+
+def _factor(job: dict) -> dict:
+    n = _int(job, "n")
+    method = job.get("method", "pminus1")
+    if method == "pminus1":
+        return {"factor": pollardpmin1(n, _int(job, "bound", 100), _int(job, "a", 2))}
+    elif method == "fermat":
+        return {"factor": fermat(n, _int(job, "max_steps", 1 << 20))}
+    elif method == "pplus1":
+        B1 = _int(job, "B1", 10000)
+        return {"factor": williams_pplus1(n, B1, _int(job, "B2", 100 * B1))}
+    raise JobError(f"unknown factor method {method!r}.")
+
+
+def _isprime(job: dict) -> dict:
+    n = _int(job, "n")
+    if n == 2:
+        return {"prime": True}
+    if n < 2:
+        return {"prime": False}
+    rounds = _int(job, "rounds", miller_rabin_samples(n))
+    return {"prime": not miller_rabin_test(n, rounds)}
+
+
+OPS: Dict[str, Callable[[dict], dict]] = {
+    "dlog": _dlog,
+    "factor": _factor,
+    "isprime": _isprime,
+}
+
+
+def run_job(job: Any) -> dict:
+    """Runs a single parsed job and returns its result (without the "line" field)."""
+    if not isinstance(job, dict):
+        raise JobError("a job must be a JSON object.")
+    op = job.get("op")
+    if op not in OPS:
+        raise JobError(f"unknown op {op!r}.")
+    result = {"op": op}
+    if "id" in job:
+        result["id"] = job["id"]
+    result.update(OPS[op](job))
+    return result
+
+
+def _run_line(lineno: int, line: str) -> dict:
+    try:
+        result = run_job(json.loads(line))
+    except json.JSONDecodeError as e:
+        result = {"error": f"bad JSON: {e}"}
+    except JobError as e:
+        result = {"error": str(e)}
+    except Exception as e:
+        # One bad job (p = 0, say) should not bring down the whole batch.
+        result = {"error": f"{type(e).__name__}: {e}"}
+    return {"line": lineno, **result}
+
+
+def _jobs(lines: Iterable[str]):
+    for lineno, line in enumerate(lines, 1):
+        if line.strip():
+            yield lineno, line
+
+
+def run(
+    lines: Iterable[str],
+    out: TextIO,
+    workers: int = None,
+    ordered: bool = True,
+    max_in_flight: int = None,
+) -> int:
+    """
+    Runs every job in lines (an iterable of JSON lines, e.g. an open file) and writes the results to
+    out, one per line. Jobs are spread over a pool of worker processes (workers=None picks one per
+    CPU, workers=0 runs everything in this process).
+
+    lines is consumed lazily: at most max_in_flight jobs (default four per worker) are submitted but
+    not yet written, so memory use does not depend on the number of jobs. When ordered is True the
+    results are written in job order, otherwise as soon as they are done.
+
+    Returns the number of jobs run.
+    """
+    count = 0
+
+    def emit(result: dict):
+        nonlocal count
+        out.write(json.dumps(result) + "\n")
+        count += 1
+
+    if workers == 0:
+        for lineno, line in _jobs(lines):
+            emit(_run_line(lineno, line))
+        return count
+
+    workers = workers or os.cpu_count() or 1
+    if max_in_flight is None:
+        max_in_flight = 4 * workers
+    max_in_flight = max(1, max_in_flight)
+
+    with ProcessPoolExecutor(workers) as pool:
+        if ordered:
+            queue = deque()
+            for lineno, line in _jobs(lines):
+                if len(queue) >= max_in_flight:
+                    emit(queue.popleft().result())
+                queue.append(pool.submit(_run_line, lineno, line))
+            while queue:
+                emit(queue.popleft().result())
+        else:
+            pending = set()
+            for lineno, line in _jobs(lines):
+                if len(pending) >= max_in_flight:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        emit(future.result())
+                pending.add(pool.submit(_run_line, lineno, line))
+            for future in wait(pending).done:
+                emit(future.result())
+
+    return count
@@ -0,0 +1,221 @@
+from random import Random
+from typing import List, Dict, Tuple, Union
+
+from . import arith
+
+# Sparse rows are dictionaries {column: coefficient}.
+SparseRow = Dict[int, int]
+
+
+def berlekamp_massey(s: List[int], q: int) -> List[int]:
+    """
+    The Berlekamp-Massey algorithm over F_q, q a prime. Finds the shortest linear recurrence
+
+        s_n + c_1 s_(n-1) + ... + c_L s_(n-L) = 0  (mod q)
+
+    satisfied by the sequence s, and returns [1, c_1, ..., c_L].
+
+    >>> berlekamp_massey([1, 1, 2, 3, 5, 8, 13], 101)
+    [1, 100, 100]
+    """
+    c, b = [1], [1]
+    L, m, bb = 0, 1, 1
+    for n in range(0, len(s)):
+        # The discrepancy between s_n and what the current recurrence predicts.
+        d = s[n]
+        for i in range(1, L + 1):
+            d += c[i] * s[n - i]
+        d %= q
+        if d == 0:
+            m += 1
+            continue
+        coef = d * arith.invert(bb, q) % q
+        t = c[:]
+        c += [0] * (len(b) + m - len(c))
+        for i, v in enumerate(b):
+            c[i + m] = (c[i + m] - coef * v) % q
+        if 2 * L <= n:
+            L, b, bb, m = n + 1 - L, t, d, 1
+        else:
+            m += 1
+    return (c + [0] * (L + 1))[: L + 1]
+
+
+def structured_elimination(
+    rows: List[SparseRow], rhs: List[int], q: int, excess: int = 10
+) -> Tuple[List[SparseRow], List[int], List[Tuple[int, SparseRow, int]]]:
+    """
+    Shrinks the sparse system rows x = rhs (mod q, q a prime) before it is
+    solved, the way structured Gaussian elimination does:
+
+        - a column that only occurs in a single row is set aside along with that row, since that row
+          gives its value once the rest is known (this may leave new such columns),
+        - a column that occurs in exactly two rows is eliminated by subtracting a multiple of one
+          row from the other, which removes one row and one column,
+        - if there are more than excess more rows than columns, the heaviest rows are dropped.
+
+    Returns the reduced rows and right hand sides, and the eliminated (column, row, rhs) in order of
+    elimination. Those are solved for afterwards by back_substitute().
+    """
+    rows = [{c: e % q for c, e in r.items() if e % q} for r in rows]
+    rhs = list(rhs)
+    alive = set(i for i, r in enumerate(rows) if r)
+    where: Dict[int, set] = {}
+    for i in alive:
+        for col in rows[i]:
+            where.setdefault(col, set()).add(i)
+
+    def drop(i):
+        alive.discard(i)
+        for col in rows[i]:
+            where[col].discard(i)
+
+    eliminated = []
+    changed = True
+    while changed:
+        changed = False
+        for col in list(where):
+            users = where[col]
+            if len(users) == 1:
+                i = next(iter(users))
+                drop(i)
+                eliminated.append((col, rows[i], rhs[i]))
+                changed = True
+            elif len(users) == 2:
+                i, j = users
+                pivot = rows[i]
+                e_i, e_j = pivot[col], rows[j][col]
+                # row_j := row_j - (e_j / e_i) row_i, which has no col.
+                f = e_j * arith.invert(e_i, q) % q
+                merged = dict(rows[j])
+                for c, e in pivot.items():
+                    merged[c] = (merged.get(c, 0) - f * e) % q
+                merged = {c: e for c, e in merged.items() if e}
+                drop(i)
+                drop(j)
+                eliminated.append((col, pivot, rhs[i]))
+                rows[j], rhs[j] = merged, (rhs[j] - f * rhs[i]) % q
+                if merged:
+                    alive.add(j)
+                    for c in merged:
+                        where.setdefault(c, set()).add(j)
+                changed = True
+            if not users:
+                del where[col]
+
+    cols = sum(1 for users in where.values() if users)
+    if len(alive) > cols + excess:
+        heaviest = sorted(alive, key=lambda i: len(rows[i]))
+        for i in heaviest[cols + excess :]:
+            drop(i)
+
+    keep = sorted(alive)
+    return [rows[i] for i in keep], [rhs[i] for i in keep], eliminated
+
+
+def back_substitute(solution: Dict[int, int], eliminated: List[Tuple[int, SparseRow, int]], q: int):
+    """
+    Fills in the columns eliminated by structured_elimination(), given a solution of the reduced
+    system. Columns that can not be determined are left out.
+    """
+    for col, row, r in reversed(eliminated):
+        total = r
+        for c, e in row.items():
+            if c == col:
+                continue
+            if c not in solution:
+                break
+            total -= e * solution[c]
+        else:
+            solution[col] = total * arith.invert(row[col], q) % q
+
+
+def wiedemann(
+    rows: List[SparseRow], rhs: List[int], q: int, tries: int = 5, rng: Random = None
+) -> Union[None, Dict[int, int]]:
+    """
+    Solves the sparse system rows x = rhs (mod q, q prime) with Wiedemann's algorithm. The system
+    needs at least as many rows as columns, and should determine every column, otherwise this is
+    likely to fail.
+
+    The system is made square by replacing the rows with N random combinations of a few of them,
+    M = R A, with every row taking part in at least one combination. For the minimal polynomial
+    f(t) = t^L + c_1 t^(L-1) + ... + c_L of M on b = R rhs (found with Berlekamp-Massey from the
+    sequence u M^i b, u random) we have f(M) b = 0. If c_L != 0 then
+
+        x = -(M^(L-1) b + c_1 M^(L-2) b + ... + c_(L-1) b) / c_L
+
+    satisfies M x = b. Only products of A with a vector are needed, so the matrix stays sparse.
+    Returns the solution as {column: value}, or None if no solution was found in tries attempts.
+    """
+    if rng is None:
+        rng = Random()
+    columns = sorted(set(c for r in rows for c in r))
+    n = len(columns)
+    if n == 0:
+        return {}
+    if len(rows) < n:
+        return None
+    index = {c: i for i, c in enumerate(columns)}
+    A = [[(index[c], e) for c, e in r.items()] for r in rows]
+
+    def apply_A(v):
+        return [sum(e * v[c] for c, e in r) % q for r in A]
+
+    for _ in range(0, tries):
+        # Every row of A goes into some combination, otherwise M would lose rank along with it.
+        R = [[] for _ in range(0, n)]
+        for i in range(0, len(A)):
+            R[i % n].append((i, rng.randrange(1, q)))
+        for r in R:
+            r += [(rng.randrange(len(A)), rng.randrange(1, q)) for _ in range(0, 2)]
+
+        def apply_R(w):
+            return [sum(f * w[i] for i, f in r) % q for r in R]
+
+        def apply_M(v):
+            return apply_R(apply_A(v))
+
+        b = apply_R(rhs)
+        u = [rng.randrange(0, q) for _ in range(0, n)]
+        seq = []
+        v = b
+        for _ in range(0, 2 * n):
+            seq.append(sum(x * y for x, y in zip(u, v)) % q)
+            v = apply_M(v)
+
+        c = berlekamp_massey(seq, q)
+        L = len(c) - 1
+        if L == 0:
+            # Most likely b = 0, and then so is x if M is non-singular.
+            x = [0] * n
+        elif c[L] == 0:
+            continue
+        else:
+            acc = b
+            for i in range(1, L):
+                acc = [(x + c[i] * y) % q for x, y in zip(apply_M(acc), b)]
+            inv = -arith.invert(c[L], q)
+            x = [a * inv % q for a in acc]
+
+        if apply_A(x) == [r % q for r in rhs]:
+            return {col: x[i] for i, col in enumerate(columns)}
+    return None
+
+
+def solve_sparse(
+    rows: List[SparseRow], rhs: List[int], q: int, rng: Random = None
+) -> Union[None, Dict[int, int]]:
+    """
+    Solves a sparse, overdetermined system rows x = rhs (mod q, q prime) by structured_elimination()
+    followed by wiedemann() on what remains. Columns the system does not determine (occurring only
+    in one row, say) are left out of the solution.
+
+    Returns {column: value}, or None if the reduced system could not be solved.
+    """
+    reduced, reduced_rhs, eliminated = structured_elimination(rows, rhs, q)
+    solution = wiedemann(reduced, reduced_rhs, q, rng=rng)
+    if solution is None:
+        return None
+    back_substitute(solution, eliminated, q)
+    return solution
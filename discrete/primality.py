@@ -1,6 +1,9 @@
 from random import randint
 from math import log, ceil
 
+from . import arith
+from .sieve import primes_up_to
+
 
 def miller_rabin(a: int, n: int) -> bool:
     """
@@ -45,12 +48,12 @@ def miller_rabin(a: int, n: int) -> bool:
     # (as that would then get squared to 1).
 
     min1 = (-1) % n
-    b = pow(a, q, n)
+    b = arith.powmod(a, q, n)
     if b == 1 or b == min1:
         return False
     i = 0
     while i < k:
-        b = pow(b, 2, n)
+        b = arith.powmod(b, 2, n)
         if b == min1:
             return False
         i += 1
@@ -115,67 +118,8 @@ def random_prime(start: int, end: int) -> int:
     raise ValueError("found no probable primes in range")
 
 
-# OEIS A000040
-FIRST_PRIMES = [
-    2,
-    3,
-    5,
-    7,
-    11,
-    13,
-    17,
-    19,
-    23,
-    29,
-    31,
-    37,
-    41,
-    43,
-    47,
-    53,
-    59,
-    61,
-    67,
-    71,
-    73,
-    79,
-    83,
-    89,
-    97,
-    101,
-    103,
-    107,
-    109,
-    113,
-    127,
-    131,
-    137,
-    139,
-    149,
-    151,
-    157,
-    163,
-    167,
-    173,
-    179,
-    181,
-    191,
-    193,
-    197,
-    199,
-    211,
-    223,
-    227,
-    229,
-    233,
-    239,
-    241,
-    251,
-    257,
-    263,
-    269,
-    271,
-]
+# The primes up to 271, OEIS A000040.
+FIRST_PRIMES = list(primes_up_to(271))
 
 # Carmichael Numbers n, a^(n-1) = 1 for every coprime a.
 # These numbers make the "trivial" test for primality using Fermat's little theorem fraught with danger.
@@ -1 +1,3 @@
-from .rsa import egcd, encrypt, decrypt, PublicKey, PrivateKey, _order, generate_keys
\ No newline at end of file
+from .rsa import egcd, encrypt, decrypt, PublicKey, PrivateKey, CRTPrivateKey, _order, generate_keys
+from .rsa import sign, verify, verify_batch
+from .keystore import KeyStore, KeyStoreError, write_keys
@@ -0,0 +1,148 @@
+"""
+A compact binary file format for large numbers of RSA public keys.
+
+Layout, all integers little-endian:
+
+    header      magic "RSAK", version (u16), reserved (u16), key count (u64), index offset (u64)
+    records     for each key, n and then e, each as a limb count (u32) followed by that many 64-bit
+                limbs, least significant first
+    index       key count offsets (u64) of the records, from the start of the file
+
+KeyStore memory-maps the file, so opening it costs nothing and only the keys actually looked at are
+ever read or turned into Python objects.
+"""
+import mmap
+import struct
+from typing import Iterable, Iterator, Tuple
+
+from .rsa import PublicKey
+
+MAGIC = b"RSAK"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHQQ")
+_LIMBS = struct.Struct("<I")
+_OFFSET = struct.Struct("<Q")
+
+
+class KeyStoreError(Exception):
+    pass
+
+
+def _pack_int(x: int) -> bytes:
+    if x < 0:
+        raise ValueError("only non-negative integers can be stored.")
+    limbs = (x.bit_length() + 63) // 64
+    return _LIMBS.pack(limbs) + x.to_bytes(8 * limbs, "little")
+
+
+def write_keys(path: str, keys: Iterable[PublicKey]) -> int:
+    """
+    Writes the public keys to a new key file at path, overwriting it if it exists. keys can be any
+    iterable and is consumed only once, but the offsets are kept in memory until the end (8 bytes per
+    key).
+
+    Returns the number of keys written.
+    """
+    offsets = []
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, 0, 0))
+        pos = _HEADER.size
+        for key in keys:
+            offsets.append(pos)
+            record = _pack_int(key.n) + _pack_int(key.e)
+            f.write(record)
+            pos += len(record)
+
+        for offset in offsets:
+            f.write(_OFFSET.pack(offset))
+
+        f.seek(0)
+        f.write(_HEADER.pack(MAGIC, VERSION, 0, len(offsets), pos))
+    return len(offsets)
+
+
+class KeyStore:
+    """
+    Read access to a key file written by write_keys(). Supports len(), indexing and iteration like a
+    sequence of PublicKey, plus iter_raw() which skips creating PublicKey objects altogether.
+
+        with KeyStore("keys.bin") as store:
+            for n, e in store.iter_raw():
+                ...
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can not be mapped.
+            self._file.close()
+            raise KeyStoreError("not a key file (empty).")
+
+        if len(self._buf) < _HEADER.size:
+            self.close()
+            raise KeyStoreError("not a key file (truncated header).")
+        magic, version, _, count, index = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC:
+            self.close()
+            raise KeyStoreError("not a key file (bad magic).")
+        if version != VERSION:
+            self.close()
+            raise KeyStoreError(f"unsupported key file version {version}.")
+        if index + count * _OFFSET.size > len(self._buf):
+            self.close()
+            raise KeyStoreError("not a key file (truncated index).")
+
+        self._count = count
+        self._index = index
+
+    def close(self):
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self) -> "KeyStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _read_int(self, pos: int) -> Tuple[int, int]:
+        """Reads an integer stored at pos, returns it and the position after it."""
+        (limbs,) = _LIMBS.unpack_from(self._buf, pos)
+        start = pos + _LIMBS.size
+        end = start + 8 * limbs
+        return int.from_bytes(self._buf[start:end], "little"), end
+
+    def raw(self, i: int) -> Tuple[int, int]:
+        """The pair (n, e) of key i."""
+        if i < 0:
+            i += self._count
+        if not 0 <= i < self._count:
+            raise IndexError("key index out of range.")
+        (pos,) = _OFFSET.unpack_from(self._buf, self._index + i * _OFFSET.size)
+        n, pos = self._read_int(pos)
+        e, _ = self._read_int(pos)
+        return n, e
+
+    def __getitem__(self, i: int) -> PublicKey:
+        return PublicKey(*self.raw(i))
+
+    def iter_raw(self) -> Iterator[Tuple[int, int]]:
+        """
+        Yields every (n, e) in file order. The records are read sequentially straight from the buffer
+        without going through the index, which is the quickest way to do something with every key.
+        """
+        pos = _HEADER.size
+        for _ in range(0, self._count):
+            n, pos = self._read_int(pos)
+            e, pos = self._read_int(pos)
+            yield n, e
+
+    def __iter__(self) -> Iterator[PublicKey]:
+        for n, e in self.iter_raw():
+            yield PublicKey(n, e)
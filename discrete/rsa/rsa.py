@@ -1,8 +1,11 @@
-from math import log2, ceil
-from typing import Tuple, Union
+from itertools import islice
+from math import log2, ceil, prod
+from random import getrandbits
+from typing import Tuple, Union, Iterable, List
 from dataclasses import dataclass
 from ..euclidean import extended as egcd
 from ..primality import random_prime
+from .. import arith
 
 
 class BadEncryptionExponent(BaseException):
@@ -14,13 +17,16 @@ class BadEncryptionExponent(BaseException):
         return f"BadEncryptionExponent: {self._msg}"
 
 
-def _order(p: int, q: int):
-    """Eulers totient function, special cased for two primes p and q."""
-    return (p - 1) * (q - 1)
+def _order(p: int, q: int, *primes: int):
+    """Eulers totient function, special cased for a product of distinct primes p, q, ..."""
+    return prod(r - 1 for r in (p, q, *primes))
 
 
 @dataclass
 class PublicKey:
+    # No per-instance __dict__, these can be plentiful (see KeyStore).
+    __slots__ = ("n", "e")
+
     n: int
     # Encryption exponent.
     e: int
@@ -31,6 +37,8 @@ class PublicKey:
 
 @dataclass
 class PrivateKey:
+    __slots__ = ("n", "d")
+
     n: int
     # Decryption exponent. Inverse of the public key exponent e in the (p-1)(q-1) finite field.
     d: int
@@ -39,6 +47,38 @@ class PrivateKey:
         return f"<PrivateKey: n={self.n:x}, d={self.d}>"
 
 
+@dataclass
+class CRTPrivateKey(PrivateKey):
+    """
+    A private key that also keeps the primes r_1, ..., r_k of n, so that decryption can be done modulo
+    each prime separately and put together with the Chinese remainder theorem (the multi-prime private
+    key of RFC 8017). Anything taking a PrivateKey takes this as well.
+    """
+
+    __slots__ = ("primes", "exponents", "coefficients")
+
+    primes: Tuple[int, ...]
+    # d_i = d mod (r_i - 1).
+    exponents: Tuple[int, ...]
+    # t_i = (r_1 ... r_(i-1))^-1 mod r_i for i = 2, ..., k.
+    coefficients: Tuple[int, ...]
+
+    @classmethod
+    def from_primes(cls, primes: Tuple[int, ...], d: int) -> "CRTPrivateKey":
+        """The key with decryption exponent d for n the product of the distinct primes."""
+        primes = tuple(primes)
+        exponents = tuple(d % (r - 1) for r in primes)
+        coefficients = []
+        R = primes[0]
+        for r in primes[1:]:
+            coefficients.append(arith.invert(R, r))
+            R *= r
+        return cls(R, d, primes, exponents, tuple(coefficients))
+
+    def __str__(self) -> str:
+        return f"<CRTPrivateKey: n={self.n:x}, d={self.d}, {len(self.primes)} primes>"
+
+
 def encrypt(plaintext: int, public_key: PublicKey) -> int:
     """
     Encrypt plaintext using the RSA algorithm with the given public key. Note that values of the
@@ -50,7 +90,7 @@ def encrypt(plaintext: int, public_key: PublicKey) -> int:
 
     Returns the ciphertext.
     """
-    return pow(plaintext, public_key.e, public_key.n)
+    return arith.powmod(plaintext, public_key.e, public_key.n)
 
 
 def decrypt(ciphertext: int, private_key: PrivateKey) -> int:
@@ -61,23 +101,59 @@ def decrypt(ciphertext: int, private_key: PrivateKey) -> int:
     Note that decrypt(encrypt(k, pubkey), privkey) = k, which is a defining property of a public key
     crypto-system.
 
+    A CRTPrivateKey is a lot quicker: there is one exponentiation modulo each prime r_i, with an
+    exponent the size of r_i, and these are combined with Garner's algorithm.
+
     Returns the plaintext.
     """
-    return pow(ciphertext, private_key.d, private_key.n)
+    if isinstance(private_key, CRTPrivateKey):
+        return _decrypt_crt(ciphertext, private_key)
+    return arith.powmod(ciphertext, private_key.d, private_key.n)
+
+
+def _decrypt_crt(ciphertext: int, private_key: CRTPrivateKey) -> int:
+    primes = private_key.primes
+    # Garner: m = m_1 + r_1 h_2 + r_1 r_2 h_3 + ..., where each h_i is chosen so that m = m_i (mod r_i).
+    m = arith.powmod(ciphertext, private_key.exponents[0], primes[0])
+    R = primes[0]
+    for r, d, t in zip(primes[1:], private_key.exponents[1:], private_key.coefficients):
+        h = (arith.powmod(ciphertext, d, r) - m) * t % r
+        m += R * h
+        R *= r
+    return m
+
+
+def _root_ceil(n: int, k: int) -> int:
+    """The smallest r with r^k >= n, for n >= 1."""
+    lo, hi = 1, 1 << (n.bit_length() + k - 1) // k
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if mid**k < n:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
 
 
 def generate_keys(
-    min_bits: int = 1024, e: int = 2**16 + 1
-) -> Tuple[PrivateKey, PublicKey]:
+    min_bits: int = 1024, e: int = 2**16 + 1, num_primes: int = 2
+) -> Tuple[CRTPrivateKey, PublicKey]:
     """
     Generates a key pair for the RSA system. Two random primes (p, q) are generated (in a not very secure
     fashion), such that their product n uses more bits than min_bits.
 
+    With num_primes > 2 n is instead the product of that many smaller primes (multi-prime RSA). Finding
+    primes gets much harder as they grow, so three primes of 683 bits are found a lot quicker than two
+    of 1024, and decryption with the CRTPrivateKey is quicker too. Each prime must still be too large
+    for the elliptic curve method, which for 2048 bits allows three primes and for 4096 bits four.
+
     The encryption exponent e can be specified, but it needs to be "less" or equal to min_bits. An exception
-    will be raised if e is not co-prime to (p - 1)(q - 1).
+    will be raised if e is not co-prime to the product of p_i - 1 over the primes p_i.
     """
     if min_bits < 1:
         raise ValueError("min_bits must be at least 1.")
+    if num_primes < 2:
+        raise ValueError("num_primes must be at least 2.")
     if e < 1:
         raise BadEncryptionExponent(
             "exponent must be 1 or larger (negative congruences are not supported.)"
@@ -86,20 +162,127 @@ def generate_keys(
     if e_bits > min_bits:
         raise BadEncryptionExponent("e uses more bits than n can be guaranteed.")
 
-    prime_bits = ceil(min_bits / 2)
-
-    range = (2 ** (prime_bits - 1), 2**prime_bits - 1)
-    p = random_prime(*range)
-    q = random_prime(*range)
-    while p == q:
-        q = random_prime(*range)
+    # Each prime is at least 2^(prime_bits - 1 / num_primes), so that their product n is at least
+    # 2^(num_primes prime_bits - 1) and has at least min_bits bits.
+    prime_bits = ceil(min_bits / num_primes)
+    lo, hi = _root_ceil(2 ** (num_primes * prime_bits - 1), num_primes), 2**prime_bits - 1
+    primes = []
+    for _ in range(0, 64 * num_primes):
+        r = random_prime(lo, hi)
+        if r not in primes:
+            primes.append(r)
+            if len(primes) == num_primes:
+                break
+    else:
+        raise ValueError("min_bits is too small for num_primes different primes.")
 
-    order = (p - 1) * (q - 1)  # Eulers totient for prime product
-    n = p * q
-    gcd, d, _ = egcd(e, order)
-    if gcd != 1:
+    order = _order(*primes)  # Eulers totient for prime product
+    try:
+        d = arith.invert(e, order)
+    except ValueError:
         raise BadEncryptionExponent("e is not coprime to the generated order.")
-    pkey = PrivateKey(n, d)
-    pubkey = PublicKey(n, e)
+    pkey = CRTPrivateKey.from_primes(primes, d)
+    pubkey = PublicKey(pkey.n, e)
 
     return pkey, pubkey
+
+
+def sign(message: int, private_key: PrivateKey) -> int:
+    """
+    Signs message (an integer less than n, in practice a padded hash) with the private key: the
+    signature is message^d (mod n). Like encrypt(), this is textbook RSA without any padding.
+    """
+    return decrypt(message, private_key)
+
+
+def verify(message: int, signature: int, public_key: PublicKey) -> bool:
+    """Whether signature is a valid signature of message, that is signature^e = message (mod n)."""
+    n = public_key.n
+    return 0 <= signature < n and encrypt(signature, public_key) == message % n
+
+
+def verify_batch(
+    pairs: Iterable[Tuple[int, int]], public_key: PublicKey, chunk_size: int = 4096, bits: int = 32
+) -> List[int]:
+    """
+    Verifies many (message, signature) pairs under the same public key, and returns the indices (in
+    the order of pairs) of those that are not valid. pairs can be any iterable, it is read chunk_size
+    pairs at a time.
+
+    A chunk is screened all at once. If every s_i^e = m_i then (prod_S s_i)^e = prod_S m_i for any subset
+    S of the chunk, which is checked for bits random subsets, with each pair in each with probability
+    1/2. Whatever the other pairs do, of putting one bad pair in S or leaving it out at most one passes,
+    so a chunk holding bad signatures gets through with probability at most 2^-bits. (The usual test
+    with random exponents, (prod s_i^r_i)^e = prod m_i^r_i, does not manage that: to a signature n - s_i
+    of -m_i only the parity of r_i matters, so two of them get through half the time.)
+
+    The subset products are computed several subsets at a time with buckets (see _screen()), which for
+    the defaults costs about 5 multiplications per pair on each side, plus an exponentiation by e per
+    subset and chunk. Verifying one signature at a time costs an exponentiation by e each (17
+    multiplications for e = 65537, and thousands for a full size e). When a chunk fails it is split in
+    two and each half is checked again, down to single pairs, so a few bad signatures only cost a few
+    extra checks.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if bits < 1:
+        raise ValueError("bits must be at least 1.")
+    n, e = public_key.n, public_key.e
+    it = iter(pairs)
+    bad = []
+    start = 0
+    while True:
+        chunk = list(islice(it, chunk_size))
+        if not chunk:
+            return bad
+        ok = []
+        for i, (m, s) in enumerate(chunk, start):
+            if 0 <= s < n:
+                ok.append((i, m % n, s))
+            else:
+                bad.append(i)
+        bad += _bisect_batch(ok, n, e, bits)
+        bad.sort()
+        start += len(chunk)
+
+
+def _bisect_batch(batch: List[Tuple[int, int, int]], n: int, e: int, bits: int) -> List[int]:
+    """The indices of the bad (index, message, signature) in batch."""
+    if not batch:
+        return []
+    if len(batch) == 1:
+        i, m, s = batch[0]
+        return [] if arith.powmod(s, e, n) == m else [i]
+
+    if _screen(batch, n, e, bits):
+        return []
+    half = len(batch) // 2
+    return _bisect_batch(batch[:half], n, e, bits) + _bisect_batch(batch[half:], n, e, bits)
+
+
+def _screen(batch: List[Tuple[int, int, int]], n: int, e: int, bits: int) -> bool:
+    """
+    Whether (prod_S s_i)^e = prod_S m_i (mod n) for bits random subsets S of the (index, message,
+    signature) in batch. The subsets are taken w at a time: every pair gets a random w bit mask and is
+    sorted into the bucket for it (one multiplication per side), and subset j is the union of the
+    buckets whose masks have bit j set. For k pairs that is k + w 2^(w - 1) multiplications per side
+    for w subsets, and w is picked to minimize it.
+    """
+    k = len(batch)
+    w = min(range(1, 17), key=lambda w: (k + w * 2 ** (w - 1)) / w)
+    for first in range(0, bits, w):
+        width = min(w, bits - first)
+        s_buckets, m_buckets = [1] * (1 << width), [1] * (1 << width)
+        for _, m, s in batch:
+            mask = getrandbits(width)
+            s_buckets[mask] = s_buckets[mask] * s % n
+            m_buckets[mask] = m_buckets[mask] * m % n
+        for j in range(0, width):
+            lhs = rhs = 1
+            for mask in range(1 << j, 1 << width):
+                if mask >> j & 1:
+                    lhs = lhs * s_buckets[mask] % n
+                    rhs = rhs * m_buckets[mask] % n
+            if arith.powmod(lhs, e, n) != rhs:
+                return False
+    return True
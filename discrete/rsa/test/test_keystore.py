@@ -0,0 +1,53 @@
+import os
+from pytest import raises
+from .. import rsa
+from ..keystore import KeyStore, KeyStoreError, write_keys
+
+
+def test_keystore_roundtrip(tmp_path):
+    path = os.path.join(tmp_path, "keys.bin")
+    keys = [
+        rsa.PublicKey(193 * 701, 11),
+        rsa.PublicKey(2**64, 2**16 + 1),
+        rsa.PublicKey(2**64 - 1, 3),
+        rsa.PublicKey(0, 0),
+    ]
+    keys += [rsa.generate_keys(min_bits=256)[1] for _ in range(0, 5)]
+
+    # Generators work too, the keys are only iterated once.
+    assert write_keys(path, (k for k in keys)) == len(keys)
+
+    with KeyStore(path) as store:
+        assert len(store) == len(keys)
+        assert list(store) == keys
+        assert list(store.iter_raw()) == [(k.n, k.e) for k in keys]
+        assert store[3] == keys[3]
+        assert store[-1] == keys[-1]
+        with raises(IndexError):
+            store[len(keys)]
+
+
+def test_keystore_empty_and_bad(tmp_path):
+    path = os.path.join(tmp_path, "keys.bin")
+    write_keys(path, [])
+    with KeyStore(path) as store:
+        assert len(store) == 0
+        assert list(store) == []
+
+    with open(path, "wb") as f:
+        f.write(b"not a key file at all")
+    with raises(KeyStoreError):
+        KeyStore(path)
+
+    with open(path, "wb"):
+        pass
+    with raises(KeyStoreError):
+        KeyStore(path)
+
+    with raises(ValueError):
+        write_keys(path, [rsa.PublicKey(-1, 3)])
+
+
+def test_keys_have_slots():
+    with raises(AttributeError):
+        rsa.PublicKey(15, 3).foo = 1
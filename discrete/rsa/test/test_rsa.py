@@ -45,3 +45,86 @@ def test_generate_keys():
     with raises(ValueError):
         # Bits are too few to guarantee two primes
         rsa.generate_keys(min_bits=2, e=1)
+
+
+def test_crt_private_key():
+    p, q, r = 193, 701, 1009
+    e = 11
+    d = pow(e, -1, rsa._order(p, q, r))
+    pkey = rsa.CRTPrivateKey.from_primes((p, q, r), d)
+    assert pkey.n == p * q * r
+    assert pkey.exponents == (d % (p - 1), d % (q - 1), d % (r - 1))
+    assert pkey.coefficients == (pow(p, -1, q), pow(p * q, -1, r))
+
+    pubkey = rsa.PublicKey(pkey.n, e)
+    for msg in (0, 1, 431, p, q * r, pkey.n - 1):
+        assert rsa.decrypt(rsa.encrypt(msg, pubkey), pkey) == msg
+        assert rsa.decrypt(rsa.encrypt(msg, pubkey), rsa.PrivateKey(pkey.n, d)) == msg
+
+
+def test_generate_keys_multi_prime():
+    with raises(ValueError):
+        rsa.generate_keys(min_bits=512, num_primes=1)
+
+    for num_primes in (2, 3, 4):
+        privkey, pubkey = rsa.generate_keys(min_bits=768, num_primes=num_primes)
+        assert len(set(privkey.primes)) == num_primes
+        assert math.prod(privkey.primes) == privkey.n == pubkey.n
+        assert 0 < privkey.d < rsa._order(*privkey.primes)
+        assert pow(pow(7, pubkey.e, pubkey.n), privkey.d, pubkey.n) == 7
+
+        ciphertext = rsa.encrypt(131, pubkey)
+        assert rsa.decrypt(ciphertext, privkey) == 131
+
+    # n has at least min_bits bits, also when that does not divide evenly over the primes.
+    for min_bits, num_primes in ((256, 4), (255, 2), (100, 3), (257, 4), (64, 5)):
+        for _ in range(0, 10):
+            _, pubkey = rsa.generate_keys(min_bits=min_bits, num_primes=num_primes)
+            assert pubkey.n.bit_length() >= min_bits
+
+
+def test_sign_verify_batch():
+    privkey, pubkey = rsa.generate_keys(min_bits=256)
+    messages = list(range(1, 301))
+    pairs = [(m, rsa.sign(m, privkey)) for m in messages]
+    assert all(rsa.verify(m, s, pubkey) for m, s in pairs)
+    assert not rsa.verify(2, pairs[0][1], pubkey)
+    assert not rsa.verify(1, pairs[0][1] + pubkey.n, pubkey)
+
+    assert rsa.verify_batch(pairs, pubkey) == []
+    assert rsa.verify_batch(iter(pairs), pubkey, chunk_size=7, bits=4) == []
+    assert rsa.verify_batch([], pubkey) == []
+
+    # A wrong message, a signature out of range, and two that cancel in a plain product.
+    n = pubkey.n
+    pairs[3] = (pairs[3][0] + 1, pairs[3][1])
+    pairs[150] = (pairs[150][0], pairs[150][1] + n)
+    pairs[200] = (pairs[200][0], pairs[200][1] * 5 % n)
+    pairs[201] = (pairs[201][0], pairs[201][1] * pow(5, -1, n) % n)
+    for chunk_size in (1, 64, 1000):
+        assert rsa.verify_batch((p for p in pairs), pubkey, chunk_size=chunk_size) == [3, 150, 200, 201]
+
+    with raises(ValueError):
+        rsa.verify_batch(pairs, pubkey, chunk_size=0)
+
+
+def test_verify_batch_negated():
+    # n - s is a signature of -m, so a pair of them cancels in a product with odd exponents. Each
+    # gets through a random subset half the time, all 32 subsets with probability 2^-32.
+    privkey, pubkey = rsa.generate_keys(min_bits=256)
+    n = pubkey.n
+    pairs = [(m, rsa.sign(m, privkey)) for m in range(1, 41)]
+    for i in (5, 17):
+        pairs[i] = (pairs[i][0], n - pairs[i][1])
+        assert not rsa.verify(*pairs[i], pubkey)
+    for _ in range(0, 50):
+        assert rsa.verify_batch(pairs, pubkey) == [5, 17]
+
+
+def test_screen():
+    n, e = 3233, 17
+    d = pow(e, -1, 3120)
+    batch = [(i, m, pow(m, d, n)) for i, m in enumerate(range(2, 100))]
+    for bits in (1, 5, 32):
+        assert rsa._screen(batch, n, e, bits)
+    assert not rsa._screen(batch + [(98, 7, 7)], n, e, 32)
@@ -1,4 +1,17 @@
-from math import floor, sqrt
+import heapq
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from math import isqrt
+from typing import Any, Union, Iterator, Tuple
+
+from .group import Group, MultiplicativeGroup
+from . import arith
+from .cache import Cache, cached
 
 
 def shanks_n(p):
@@ -7,10 +20,10 @@ def shanks_n(p):
     >>> shanks_n(17)
     5
     """
-    return floor(sqrt(p - 1)) + 1
+    return isqrt(p - 1) + 1
 
 
-def shanks(g, h, p):
+def shanks(g, h, p, cache: Cache = None):
     """
     "Solves" the Discrete Logarithm Problem g^x = h mod p using Shank's Babystep-Gianstep algorithm.
 
@@ -18,6 +31,9 @@ def shanks(g, h, p):
     (primitive roots), if g is a generator, this is guaranteed a solution. In other cases, this might
     fail.
 
+    This is shanks_group() in the group F_p*. With a cache (see discrete.cache) the answer is looked up
+    there first, and stored there afterwards.
+
     >>> shanks(11, 21, 71)
     37
     >>> shanks(2, 3, 5)
@@ -25,21 +41,261 @@ def shanks(g, h, p):
     >>> pow(156, shanks(156, 116, 593), 593)
     116
     """
-    n = shanks_n(p)
-    list1 = {pow(g, k, p): k for k in range(0, n + 1)}
-    list2 = {h * pow(g, -n * k, p) % p: k for k in range(0, n + 1)}
-    print(list1, list2)
-
-    x = None
-    for gpow, k1 in list1.items():
-        if gpow in list2:
-            k2 = list2[gpow]
-            tmp = (k1 + k2 * n) % (p - 1)
-            if x is None or tmp < x:
-                x = tmp
-            break
-
-    return x
+    return cached(cache, "dlog", (g % p, h % p, p), lambda: shanks_group(MultiplicativeGroup(p), g, h))
+
+
+def shanks_group(group: Group, g: Any, h: Any) -> Union[None, int]:
+    """
+    Shank's Babystep-Giantstep algorithm in any group, see the Group protocol. Solves g^x = h for the
+    smallest 0 <= x < group.order, or returns None if h is not a power of g.
+
+    With n = shanks_n(order + 1) (so n^2 >= order) any such x can be written x = j + k n, 0 <= j, k < n.
+    The baby steps g^j are stored in a dictionary, and the giant steps h g^(-kn) are looked up in it
+    until one matches. This takes about 2 sqrt(order) group operations and sqrt(order) memory.
+    """
+    order = group.order
+    n = shanks_n(order + 1)
+
+    baby = {}
+    e = group.identity
+    for j in range(0, n):
+        # Keep the smallest j, in case g has a smaller order than the group.
+        baby.setdefault(group.encode(e), j)
+        e = group.op(e, g)
+
+    giant = group.exp(g, -n)
+    y = h
+    for k in range(0, n):
+        j = baby.get(group.encode(y))
+        if j is not None:
+            return (j + k * n) % order
+        y = group.op(y, giant)
+
+    return None
+
+
+class BabyStepTable:
+    """
+    The baby steps g^j, 0 <= j < m, of Shank's algorithm in F_p* kept in a memory-mapped file rather
+    than a dictionary, for when sqrt(p) entries do not fit in memory.
+
+    The file holds a short header describing (g, p, order, m) followed by two arrays of m 64-bit
+    integers: the keys, which are the low 64 bits of g^j sorted in increasing order, and the matching
+    exponents j. Since the keys are sorted, a lookup is a binary search, and a batch of lookups done in
+    increasing key order sweeps through the file front to back. Keys are truncated for p > 2^64, so a
+    match only is a candidate, to be checked with pow.
+
+    A table is built once with build() and can then be opened with open() by any number of processes,
+    which share the file through the page cache. It takes 16 m bytes of disk.
+
+    Building sorts runs of baby steps in memory, writes them to a temporary file and merges them, at
+    most 64 at a time (in several passes if there are more), so it needs about memory bytes and a few
+    open files no matter how large m is.
+
+    The table can be made smaller than the full sqrt(order) entries to save space. A table with m
+    entries needs order / m giant steps rather than sqrt(order), so halving the table doubles the
+    time for each logarithm.
+    """
+
+    MAGIC = b"BSGS"
+    VERSION = 1
+    _HEADER = struct.Struct("<4sHHQ")  # magic, version, byte order, length of the parameters
+    _RUN = struct.Struct("=QQ")
+    # Rough size of a (key, j) tuple in a Python list.
+    _RECORD_MEMORY = 160
+    # Most runs merged at once.
+    _FAN_IN = 64
+
+    def __init__(self, path: str, g: int, p: int, order: int, m: int, start: int):
+        self.path = path
+        self.g, self.p, self.order, self.m = g, p, order, m
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._keys = memoryview(self._buf)[start : start + 8 * m].cast("Q")
+        self._js = memoryview(self._buf)[start + 8 * m : start + 16 * m].cast("Q")
+
+    @classmethod
+    def _params(cls, g: int, p: int, order: int, m: int) -> bytes:
+        return ",".join(str(v) for v in (g, p, order, m)).encode("ascii")
+
+    @classmethod
+    def build(
+        cls, path: str, g: int, p: int, m: int = None, order: int = None, memory: int = 1 << 26
+    ) -> "BabyStepTable":
+        """
+        Builds the table of g^j (mod p), 0 <= j < m, in a new file at path and opens it. m defaults
+        to shanks_n(order + 1), that is a full table, and order to p - 1.
+        """
+        if order is None:
+            order = p - 1
+        if m is None:
+            m = shanks_n(order + 1)
+        if not 1 <= m <= order:
+            raise ValueError("m must be between 1 and the order.")
+        run_size = max(1, memory // cls._RECORD_MEMORY)
+
+        params = cls._params(g, p, order, m)
+        header = cls._HEADER.pack(cls.MAGIC, cls.VERSION, sys.byteorder == "little", len(params))
+        # Align the arrays to 8 bytes.
+        start = (len(header) + len(params) + 7) // 8 * 8
+
+        fan_in = cls._FAN_IN
+        # Each run being merged reads a block at a time, the blocks together take about memory bytes.
+        buffer = max(1, memory // fan_in // cls._RUN.size) * cls._RUN.size
+
+        # All runs go one after the other in a single temporary file, as (begin, end) offsets, so that
+        # their number does not matter for the open files.
+        directory = os.path.dirname(os.path.abspath(path))
+        f = tempfile.TemporaryFile(dir=directory)
+        try:
+            runs = []
+            e = 1
+            for first in range(0, m, run_size):
+                run = []
+                for j in range(first, min(first + run_size, m)):
+                    run.append((e & 0xFFFFFFFFFFFFFFFF, j))
+                    e = e * g % p
+                run.sort()
+                begin = f.tell()
+                array("Q", (v for record in run for v in record)).tofile(f)
+                runs.append((begin, f.tell()))
+                del run
+
+            # Merge fan_in runs at a time into longer runs in another file, until few enough are left
+            # for the last merge.
+            while len(runs) > fan_in:
+                merged = tempfile.TemporaryFile(dir=directory)
+                longer = []
+                for i in range(0, len(runs), fan_in):
+                    begin = merged.tell()
+                    block = array("Q")
+                    for record in cls._merge(f, runs[i : i + fan_in], buffer):
+                        block.extend(record)
+                        if len(block) >= 16384:
+                            block.tofile(merged)
+                            block = array("Q")
+                    block.tofile(merged)
+                    longer.append((begin, merged.tell()))
+                f.close()
+                f, runs = merged, longer
+
+            with open(path, "wb") as keys, open(path, "r+b") as js:
+                keys.write(header + params + bytes(start - len(header) - len(params)))
+                js.seek(start + 8 * m)
+                block_keys, block_js = array("Q"), array("Q")
+                for key, j in cls._merge(f, runs, buffer):
+                    block_keys.append(key)
+                    block_js.append(j)
+                    if len(block_keys) >= 8192:
+                        block_keys.tofile(keys)
+                        block_js.tofile(js)
+                        block_keys, block_js = array("Q"), array("Q")
+                block_keys.tofile(keys)
+                block_js.tofile(js)
+        finally:
+            f.close()
+
+        return cls(path, g, p, order, m, start)
+
+    @classmethod
+    def _merge(cls, f, runs, buffer: int) -> Iterator[Tuple[int, int]]:
+        """The records of the sorted runs (begin, end) of f, merged in increasing order."""
+        return heapq.merge(*(cls._read_run(f, begin, end, buffer) for begin, end in runs))
+
+    @classmethod
+    def _read_run(cls, f, begin: int, end: int, buffer: int) -> Iterator[Tuple[int, int]]:
+        # The runs share f, so every read seeks to where this run is up to.
+        while begin < end:
+            f.seek(begin)
+            block = f.read(min(buffer, end - begin))
+            begin += len(block)
+            yield from cls._RUN.iter_unpack(block)
+
+    @classmethod
+    def open(cls, path: str) -> "BabyStepTable":
+        """Opens a table previously made by build()."""
+        with open(path, "rb") as f:
+            header = f.read(cls._HEADER.size)
+            if len(header) < cls._HEADER.size:
+                raise ValueError("not a baby step table (truncated header).")
+            magic, version, little, length = cls._HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError("not a baby step table, or an unsupported version.")
+            if bool(little) != (sys.byteorder == "little"):
+                raise ValueError("the table was built on a machine with another byte order.")
+            g, p, order, m = (int(v) for v in f.read(length).decode("ascii").split(","))
+
+        start = (cls._HEADER.size + length + 7) // 8 * 8
+        if os.path.getsize(path) < start + 16 * m:
+            raise ValueError("the baby step table is truncated.")
+        return cls(path, g, p, order, m, start)
+
+    def close(self):
+        self._keys.release()
+        self._js.release()
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self) -> "BabyStepTable":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def solve(self, h: int, batch: int = 4096) -> Union[None, int]:
+        """
+        Solves g^x = h (mod p) for the smallest 0 <= x < order using this table, or returns None.
+
+        The giant steps h g^(-km) are taken batch at a time, and each batch is sorted before it is
+        looked up, so the reads from the table are in file order.
+        """
+        g, p, m = self.g, self.p, self.m
+        keys, js = self._keys, self._js
+        h %= p
+        giant = arith.powmod(g, -m, p)
+        steps = (self.order + m - 1) // m
+
+        y = h
+        for first in range(0, steps, batch):
+            lookups = []
+            for k in range(first, min(first + batch, steps)):
+                lookups.append((y & 0xFFFFFFFFFFFFFFFF, k))
+                y = y * giant % p
+            lookups.sort()
+
+            x = None
+            i = 0
+            for key, k in lookups:
+                i = bisect_left(keys, key, i)
+                t = i
+                while t < m and keys[t] == key:
+                    candidate = js[t] + k * m
+                    if (x is None or candidate < x) and arith.powmod(g, candidate, p) == h:
+                        x = candidate
+                    t += 1
+            if x is not None:
+                return x % self.order
+
+        return None
+
+
+def shanks_disk(
+    g: int, h: int, p: int, path: str, m: int = None, memory: int = 1 << 26
+) -> Union[None, int]:
+    """
+    shanks() with the baby steps in a file (see BabyStepTable) instead of memory. If path already holds
+    a table for g and p it is reused, otherwise a table with m entries is built there first. Raises
+    ValueError if the table there is for other g or p, or for another m if m is given.
+    """
+    if os.path.exists(path):
+        table = BabyStepTable.open(path)
+        if (table.g, table.p) != (g, p) or (m is not None and table.m != m):
+            table.close()
+            raise ValueError(f"{path} holds a table for other parameters.")
+    else:
+        table = BabyStepTable.build(path, g, p, m, memory=memory)
+    with table:
+        return table.solve(h)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+"""
+Small primes, by a segmented sieve of Eratosthenes.
+
+Only odd numbers are sieved (2 is handled separately), one flag per odd number, and the range is
+sieved a segment at a time so that the flags stay in the CPU cache and memory use does not grow with
+the range. The flags are a bytearray, or a numpy array when numpy is installed, which is quicker at
+turning them back into numbers.
+
+    primes_up_to(n)             every prime <= n as an array of machine integers
+    iter_primes(start, stop)    the primes start <= p < stop one by one, for ranges too long to keep
+
+primes_up_to() remembers its largest result up to memo_limit() (see set_memo_limit()), so asking
+again for the same or fewer primes costs nothing.
+"""
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from itertools import compress
+from math import isqrt
+from typing import Iterator, List
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Odd numbers per segment, so a segment spans twice this many integers. 2^15 flags fit in the L1
+# cache of most CPUs. Far out segments are made longer, see _width().
+SEGMENT = 1 << 15
+
+_memo = array("I", [2, 3, 5, 7])
+_memo_bound = 10
+_memo_limit = 1 << 22
+
+
+def memo_limit() -> int:
+    """primes_up_to(n) for n up to this is remembered."""
+    return _memo_limit
+
+
+def set_memo_limit(limit: int):
+    """Changes memo_limit(), and forgets what was remembered beyond it."""
+    global _memo, _memo_bound, _memo_limit
+    if limit < 10:
+        raise ValueError("the limit must be at least 10.")
+    _memo_limit = limit
+    if _memo_bound > limit:
+        _memo = _memo[: bisect_right(_memo, limit)]
+        _memo_bound = limit
+
+
+def _typecode(n: int) -> str:
+    return "I" if n < 1 << 32 else "Q"
+
+
+def _segment(lo: int, hi: int, base: List[int]) -> List[int]:
+    """The odd primes in [lo, hi), lo odd and >= 3, given all odd primes up to sqrt(hi)."""
+    size = (hi - lo + 1) // 2
+    if size <= 0:
+        return []
+    # Flag i stands for lo + 2 i.
+    flags = np.ones(size, dtype=bool) if np is not None else bytearray(b"\x01") * size
+    for p in base:
+        if p * p >= hi:
+            break
+        # The first odd multiple of p in the segment, and not below p^2 (smaller ones are crossed off
+        # by smaller primes).
+        start = max(p * p, (lo + p - 1) // p * p)
+        if start % 2 == 0:
+            start += p
+        i = (start - lo) // 2
+        if i < size:
+            if np is not None:
+                flags[i::p] = False
+            else:
+                flags[i::p] = bytes(len(range(i, size, p)))
+    if np is not None:
+        return (lo + 2 * np.flatnonzero(flags)).tolist()
+    return list(compress(range(lo, lo + 2 * size, 2), flags))
+
+
+def _base_primes(hi: int) -> List[int]:
+    """The odd primes up to sqrt(hi), which is what sieving below hi needs."""
+    return list(primes_up_to(isqrt(hi)))[1:]
+
+
+def _width(hi: int) -> int:
+    """
+    The span of a segment below hi. Every segment costs a step for each base prime, so past 2^30 the
+    segments grow with sqrt(hi) to keep that cost below the crossing off itself.
+    """
+    return 2 * max(SEGMENT, isqrt(hi))
+
+
+def _sieve_range(lo: int, hi: int) -> array:
+    """The primes in [lo, hi) as an array, segment by segment. For the worker processes."""
+    base = _base_primes(hi)
+    out = array(_typecode(hi))
+    if lo <= 2 < hi:
+        out.append(2)
+    lo = max(lo, 3) | 1
+    width = _width(hi)
+    for first in range(lo, hi, width):
+        out.extend(_segment(first, min(first + width, hi), base))
+    return out
+
+
+def primes_up_to(n: int, processes: int = 1) -> array:
+    """
+    Every prime p <= n, in increasing order, as an array.array of unsigned ints (of 64 bits if n is
+    that large). Slices, iteration, indexing and bisect all work as for a list.
+
+    With processes > 1 the range is cut into that many pieces, which are sieved in parallel by a pool
+    of processes. That is only worth it for n in the tens of millions and above.
+
+    >>> list(primes_up_to(30))
+    [2, 3, 5, 7, 11, 13, 17, 19, 23, 29]
+    """
+    global _memo, _memo_bound
+    if n <= _memo_bound:
+        return _memo[: bisect_right(_memo, n)]
+
+    if processes > 1:
+        # Build the base primes here (and remember them) before the workers all do it.
+        _base_primes(n + 1)
+        cuts = [n * i // processes for i in range(0, processes)] + [n + 1]
+        with ProcessPoolExecutor(processes) as pool:
+            parts = list(pool.map(_sieve_range, cuts[:-1], cuts[1:]))
+        primes = array(_typecode(n))
+        for part in parts:
+            primes.extend(part)
+    else:
+        # Only the part past what is remembered needs sieving.
+        primes = array(_typecode(n), _memo)
+        primes.extend(_sieve_range(_memo_bound + 1, n + 1))
+
+    if n <= _memo_limit:
+        _memo, _memo_bound = primes, n
+        return primes[:]
+    return primes
+
+
+def iter_primes(start: int = 2, stop: int = None) -> Iterator[int]:
+    """
+    The primes start <= p < stop in increasing order, found a segment at a time as they are asked for,
+    so that memory use stays small however far it goes. Without stop it goes on forever.
+
+    >>> list(iter_primes(100, 130))
+    [101, 103, 107, 109, 113, 127]
+    """
+    if stop is not None and stop <= start:
+        return
+    if start <= 2 and (stop is None or stop > 2):
+        yield 2
+    lo = max(start, 3) | 1
+    base, base_bound = [], 1
+    while stop is None or lo < stop:
+        hi = lo + _width(lo) if stop is None else min(lo + _width(lo), stop)
+        if base_bound * base_bound < hi:
+            # Enough base primes for a good while, rather than for this segment alone.
+            base_bound = isqrt(4 * hi) + 1
+            base = _base_primes(base_bound * base_bound)
+        yield from _segment(lo, hi, base)
+        lo = hi | 1
@@ -0,0 +1,65 @@
+import pytest
+from pytest import raises
+
+from .. import arith
+from ..primality import FIRST_PRIMES
+
+
+@pytest.fixture(params=arith.available())
+def backend(request):
+    previous = arith.backend()
+    arith.set_backend(request.param)
+    yield request.param
+    arith.set_backend(previous)
+
+
+def test_set_backend():
+    assert arith.backend() in arith.available()
+    assert "python" in arith.available()
+    with raises(ValueError):
+        arith.set_backend("nope")
+
+
+def test_powmod_invert(backend):
+    p = 2**127 - 1
+    cases = [(2, 10, 1000, 24), (3, 0, 7, 1), (5, 3, 1, 0), (-2, 3, 7, 6), (3, -1, 7, 5), (2, p - 1, p, 1)]
+    for a, k, n, expected in cases:
+        assert arith.powmod(a, k, n) == expected
+        assert type(arith.powmod(a, k, n)) is int
+
+    assert arith.invert(3, 7) == 5
+    assert arith.invert(-3, 7) == 2
+    assert arith.invert(12345, p) * 12345 % p == 1
+    with raises(ValueError):
+        arith.invert(6, 9)
+    with raises(ValueError):
+        arith.invert(0, 7)
+    with raises(ValueError):
+        arith.powmod(6, -1, 9)
+
+
+def test_gcd_isqrt(backend):
+    assert arith.gcd(12, 18) == 6
+    assert arith.gcd(-12, 18) == 6
+    assert arith.gcd(0, 0) == 0
+    for a, b in [(240, 46), (-240, 46), (17, 0), (0, 17), (2**100 + 1, 3**50), (0, 0)]:
+        d, u, v = arith.gcdext(a, b)
+        assert d == arith.gcd(a, b)
+        assert a * u + b * v == d
+
+    for n in (0, 1, 2, 3, 4, 99, 100, 10**40, 10**40 - 1):
+        r = arith.isqrt(n)
+        assert r * r <= n < (r + 1) ** 2
+    with raises(ValueError):
+        arith.isqrt(-1)
+
+
+def test_is_probable_prime(backend):
+    primes = set(FIRST_PRIMES)
+    for n in range(-5, FIRST_PRIMES[-1] + 1):
+        assert arith.is_probable_prime(n) == (n in primes)
+    # Carmichael numbers and a strong pseudoprime to base 2.
+    for n in (561, 41041, 825265, 2047, (2**61 - 1) * (2**31 - 1)):
+        assert not arith.is_probable_prime(n)
+    for p in (2**61 - 1, 2**127 - 1, 2**521 - 1):
+        assert arith.is_probable_prime(p)
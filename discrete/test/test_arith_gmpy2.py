@@ -0,0 +1,57 @@
+from random import Random
+
+import pytest
+
+from .. import arith
+
+gmpy2 = pytest.importorskip("gmpy2")
+
+
+def _both(name: str, *args):
+    """What the python and the gmpy2 implementations of name give for args, or the exception type."""
+    results = []
+    for implementation in (getattr(arith, "_py_" + name), getattr(arith, "_gmp_" + name)):
+        try:
+            result = implementation(*args)
+            # Plain Python types, not gmpy2's mpz.
+            assert type(result) is {"is_probable_prime": bool, "gcdext": tuple}.get(name, int)
+            results.append(result)
+        except ValueError:
+            results.append(ValueError)
+    return results
+
+
+def test_powmod_invert_agree():
+    rng = Random(36)
+    moduli = [1, 2, 9, 10007, 2**61 - 1, 2**127 - 1, 3**80, 2**1024 + 643]
+    for n in moduli:
+        for _ in range(0, 50):
+            a = rng.randrange(-2 * n, 2 * n)
+            k = rng.randrange(-(2**70), 2**70)
+            py, gmp = _both("powmod", a, k, n)
+            assert py == gmp, (a, k, n)
+            py, gmp = _both("invert", a, n)
+            assert py == gmp, (a, n)
+
+    # Not invertible, both must raise ValueError rather than anything backend specific.
+    for a, k, n in [(6, -1, 9), (0, -3, 7), (10, -2, 2**10), (3**5, -1, 3**80)]:
+        assert _both("powmod", a, k, n) == [ValueError, ValueError]
+        assert _both("invert", a, n) == [ValueError, ValueError]
+
+
+def test_gcd_isqrt_prime_agree():
+    rng = Random(360)
+    for _ in range(0, 200):
+        a, b = rng.randrange(-(2**200), 2**200), rng.randrange(-(2**100), 2**100)
+        py, gmp = _both("gcd", a, b)
+        assert py == gmp
+        for d, u, v in _both("gcdext", a, b):
+            # The backends may pick different u and v, but both must be right.
+            assert d == py and a * u + b * v == d
+            assert type(u) is type(v) is int
+        py, gmp = _both("isqrt", abs(a))
+        assert py == gmp
+
+    for n in list(range(-5, 1000)) + [561, 41041, 2047, 2**61 - 1, 2**127 - 1, (2**61 - 1) ** 2]:
+        py, gmp = _both("is_probable_prime", n)
+        assert py == gmp, n
@@ -0,0 +1,117 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from pytest import raises
+
+from ..cache import Cache, MISSING, cached
+from ..shanks import shanks
+from ..dlp import pollard_rho, pohlig_hellman, is_primitive_root, multiplicative_order
+from ..factor import pollardpmin1
+
+
+def test_get_put(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    with Cache(path) as cache:
+        assert cache.get("dlog", (2, 1821, 2699)) is MISSING
+        cache.put("dlog", (2, 1821, 2699), 715)
+        cache.put("dlog", (2, 3, 5), None)
+        cache.put("factorization", (2698,), [[2, 1], [19, 1], [71, 1]])
+        assert cache.get("dlog", (2, 1821, 2699)) == 715
+        assert cache.get("dlog", (2, 3, 5)) is None
+        assert cache.get("factorization", (2698,)) == [[2, 1], [19, 1], [71, 1]]
+        # Kinds are separate.
+        assert cache.get("pminus1", (2, 1821, 2699)) is MISSING
+        assert (cache.hits, cache.misses) == (3, 2)
+        assert cache.hit_rate == 3 / 5
+        assert len(cache) == 3
+
+    # It persists.
+    with Cache(path) as cache:
+        assert cache.get("dlog", (2, 1821, 2699)) == 715
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.get("dlog", (2, 1821, 2699)) is MISSING
+
+    with raises(ValueError):
+        Cache(path, max_entries=0)
+
+
+def test_eviction(tmp_path):
+    with Cache(str(tmp_path / "cache.sqlite"), max_entries=3, flush_every=1) as cache:
+        for i in range(0, 3):
+            cache.put("x", (i,), i)
+        # 0 is now the most recently used, so 1 goes first.
+        assert cache.get("x", (0,)) == 0
+        cache.put("x", (3,), 3)
+        assert len(cache) == 3
+        assert cache.get("x", (1,)) is MISSING
+        assert [cache.get("x", (i,)) for i in (0, 2, 3)] == [0, 2, 3]
+
+
+def test_cached(tmp_path):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return None
+
+    assert cached(None, "x", (1,), lambda: 5) == 5
+    with Cache(str(tmp_path / "cache.sqlite")) as cache:
+        assert cached(cache, "x", (1,), compute) is None
+        assert cached(cache, "x", (1,), compute) is None
+        assert len(calls) == 1
+        assert cached(cache, "x", (2,), compute, keep=lambda v: v is not None) is None
+        assert cached(cache, "x", (2,), compute, keep=lambda v: v is not None) is None
+        assert len(calls) == 3
+
+
+def test_solvers(tmp_path):
+    with Cache(str(tmp_path / "cache.sqlite")) as cache:
+        assert shanks(2, 1821, 2699, cache=cache) == 715
+        assert cache.misses == 1
+        assert shanks(2, 1821, 2699, cache=cache) == 715
+        assert pollard_rho(2, 1821 + 2699, 2699, cache=cache) == 715
+        assert pohlig_hellman(2, 1821, 2699, cache=cache) == 715
+        assert cache.hits == 3
+
+        assert pollardpmin1(1403, 100, cache=cache) == pollardpmin1(1403, 100) == 61
+        assert pollardpmin1(1403, 100, cache=cache) == 61
+        assert pollardpmin1(1403, 4, cache=cache) is None
+
+        assert is_primitive_root(2, 2699, cache=cache)
+        assert not is_primitive_root(4, 2699, cache=cache)
+        assert is_primitive_root(2, 2699, cache=cache)
+        assert multiplicative_order(4, 2699, cache=cache) == 1349
+        assert cache.get("factorization", (2698,)) == [[2, 1], [19, 1], [71, 1]]
+
+
+def test_solvers_agree(tmp_path):
+    # 110 has order 150 modulo 143401, so rho may find x + 150 k. What it stores must still be what
+    # shanks() and pohlig_hellman() would give without the cache.
+    p, g = 143401, 110
+    with Cache(str(tmp_path / "cache.sqlite")) as cache:
+        for x in (1, 97):
+            h = pow(g, x + 5 * 150, p)
+            found = None
+            for _ in range(0, 10):
+                found = pollard_rho(g, h, p, cache=cache)
+                if found is not None:
+                    break
+            assert found == x
+            assert cache.get("dlog", (g, h, p)) == x
+            assert shanks(g, h, p, cache=cache) == shanks(g, h, p) == x
+            assert pohlig_hellman(g, h, p, cache=cache) == x
+
+
+def _solve(cache, h):
+    return shanks(2, h, 2699, cache=cache)
+
+
+def test_processes(tmp_path):
+    cache = Cache(str(tmp_path / "cache.sqlite"))
+    hs = [pow(2, x, 2699) for x in range(0, 200)]
+    with ProcessPoolExecutor(4) as pool:
+        assert list(pool.map(_solve, [cache] * len(hs), hs)) == list(range(0, 200))
+        assert list(pool.map(_solve, [cache] * len(hs), hs)) == list(range(0, 200))
+    assert len(cache) == 200
+    assert all(cache.get("dlog", (2, h, 2699)) == x for x, h in enumerate(hs))
+    cache.close()
@@ -0,0 +1,26 @@
+from pytest import raises
+
+from ..dh import DiffieHellman, generate_private, public, shared_secret
+
+
+def test_dh_bad_input():
+    with raises(ValueError):
+        generate_private(3)
+
+
+def test_dh_shared_secret():
+    # A Mersenne prime. 2 has small order here, but the agreement works in any subgroup.
+    g, p = 2, 2**127 - 1
+
+    a, b = generate_private(p), generate_private(p)
+    A, B = public(a, g, p), public(b, g, p)
+    assert shared_secret(a, B, p) == shared_secret(b, A, p) == pow(g, a * b, p)
+
+    dh = DiffieHellman(g, p)
+    assert dh.public(a) == A
+    assert dh.shared(a, B) == shared_secret(a, B, p)
+
+    for x, X in dh.keypairs(10):
+        assert X == pow(g, x, p)
+
+    assert dh.public_batch([a, b]) == [A, B]
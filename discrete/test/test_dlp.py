@@ -1,6 +1,12 @@
+from functools import partial
+
 from pytest import raises
 
-from discrete.dlp import pollard_rho
+from discrete.dlp import pollard_rho, pollard_rho_group, pohlig_hellman, index_calculus, IndexCalculus
+from discrete.dlp import pollard_walk, teske_walk
+from discrete.dlp import multiplicative_order, kangaroo, kangaroo_group
+from discrete.group import MultiplicativeGroup, ECGroup
+from discrete.ec import Curve
 
 
 def test_pollard_rho_bad_input():
@@ -45,6 +51,8 @@ def test_pollard_rho_solvable():
 
     for g, h, p, expected in cases:
         assert pollard_rho(g, h, p) == expected
+        assert pohlig_hellman(g, h, p) == expected
+        assert index_calculus(g, h, p) == expected
 
 
 def test_pollard_rho_non_solvable():
@@ -76,3 +84,129 @@ def test_pollard_rho_non_solvable():
 
     for g, h, p in cases:
         assert pollard_rho(g, h, p) is None
+        assert pohlig_hellman(g, h, p) is None
+        assert index_calculus(g, h, p) is None
+
+
+def test_pollard_rho_group_subgroup():
+    # p = 2 k q + 1 where q is prime, and g = a^((p - 1) / q) has order q.
+    q, p, g = 2069051, 2432099102767, 1081194394585
+    group = MultiplicativeGroup(p, q)
+
+    assert pollard_rho_group(group, g, 734017640817) == 1941624
+    assert pollard_rho_group(group, g, pow(g, q - 1, p)) == q - 1
+    assert pollard_rho_group(group, g, 1) == 0
+
+
+def test_pollard_rho_non_generator():
+    # 110 has order 150 modulo 143401, so x is only known modulo 150 and collisions are often
+    # useless modulo p - 1. Those must lead to another walk, not to giving up.
+    p, g = 143401, 110
+    group = MultiplicativeGroup(p)
+    for x in range(0, 150, 7):
+        h = pow(g, x, p)
+        assert pow(g, pollard_rho_group(group, g, h, retries=20), p) == h
+
+    # 42202 has order 32590 modulo 97771, a third of p - 1.
+    g, h, p = 42202, 6825, 97771
+    assert pow(g, pollard_rho_group(MultiplicativeGroup(p), g, h, retries=20), p) == h
+
+
+def test_pollard_rho_group_elliptic_curve():
+    # This curve has 10039 points, a prime, so any point but infinity generates it.
+    curve = Curve(10007, 3, 6)
+    group = ECGroup(curve, 10039)
+    P = (5, 4270)
+
+    for x in (0, 1, 2, 1000, 5017, 10038):
+        assert pollard_rho_group(group, P, curve.mul(x, P)) == x
+
+
+def test_pollard_rho_walks():
+    q, p, g = 2069051, 2432099102767, 1081194394585
+    group = MultiplicativeGroup(p, q)
+    for walk in (pollard_walk, teske_walk, partial(teske_walk, r=5), partial(teske_walk, r=64)):
+        assert pollard_rho_group(group, g, 734017640817, walk=walk) == 1941624
+        assert pollard_rho(2, 1821, 2699, walk=walk) == 715
+
+
+def test_kangaroo():
+    p, g = 2**127 - 1, 3
+    cases = [
+        # (x, lo, hi)
+        (0, 0, 10),
+        (715, 700, 800),
+        (123456, 0, 1 << 20),
+        (1 << 20, 0, 1 << 20),
+        (3141592653, 1 << 31, 1 << 32),
+        (12345678901234, 12345678000000, 12345679000000),
+    ]
+    for x, lo, hi in cases:
+        assert kangaroo(g, pow(g, x, p), p, lo, hi) == x
+
+    # Not in the interval.
+    assert kangaroo(g, pow(g, 5, p), p, 100, 200) is None
+    assert kangaroo(g, pow(g, 5, p), p, 100, 1 << 20, max_steps=20000) is None
+    with raises(ValueError):
+        kangaroo(g, g, p, 10, 1)
+
+
+def test_kangaroo_processes():
+    p, g = 2**127 - 1, 3
+    x = 987654321
+    assert kangaroo(g, pow(g, x, p), p, 1 << 29, 1 << 30, processes=2) == x
+
+
+def test_kangaroo_group_elliptic_curve():
+    curve = Curve(10007, 3, 6)
+    group = ECGroup(curve, 10039)
+    P = (5, 4270)
+    for x in (0, 17, 5017, 10038):
+        assert kangaroo_group(group, P, curve.mul(x, P), 0, 10038, seed=x) == x
+
+
+def test_multiplicative_order():
+    # 2 has order 11 modulo 23, 5 is a primitive root.
+    assert multiplicative_order(2, 23) == 11
+    assert multiplicative_order(5, 23) == 22
+    assert multiplicative_order(1, 23) == 1
+
+
+def test_pohlig_hellman_smooth_order():
+    # p - 1 = 2^5 3^4 5^3 7^2 11 has only small factors, which is what Pohlig-Hellman is good for.
+    p = 2**5 * 3**4 * 5**3 * 7**2 * 11 + 1
+    g = 13
+    for x in (0, 1, 2, 12345, p - 2):
+        assert pohlig_hellman(g, pow(g, x, p), p) == x
+
+    # 7 is not a primitive root, the answer is the smallest solution.
+    n = multiplicative_order(7, p)
+    assert n < p - 1
+    assert pohlig_hellman(7, pow(7, n + 5, p), p) == 5
+    assert pohlig_hellman(7, 13, p) is None
+
+
+def test_index_calculus_safe_prime():
+    # p = 2 q + 1 with q prime, so everything modulo q is done by linear algebra.
+    p, g = 2901564767, 5
+    assert pow(g, (p - 1) // 2, p) != 1
+
+    ic = IndexCalculus(g, p, seed=1)
+    assert ic.large == [(p - 1) // 2]
+    for x in (0, 1, 1234567, p - 2):
+        assert ic.log(pow(g, x, p)) == x
+    assert ic.log(0) is None
+
+    assert index_calculus(g, pow(g, 987654321, p), p) == 987654321
+
+
+def test_index_calculus_linear_algebra_small_p():
+    # With a small ph_limit even small primes are handled by relations and linear algebra.
+    for g, h, p, expected in [(5, 25940, 30757, 24463), (3, 1317, 4327, 871), (2, 1821, 2699, 715)]:
+        assert IndexCalculus(g, p, ph_limit=4, seed=2).log(h) == expected
+
+
+def test_index_calculus_processes():
+    p, g = 2901564767, 5
+    ic = IndexCalculus(g, p, processes=2, seed=3)
+    assert ic.log(pow(g, 31337, p)) == 31337
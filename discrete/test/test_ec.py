@@ -0,0 +1,70 @@
+from random import randint
+from pytest import raises
+
+from ..ec import Curve, wnaf, SECP256K1, P256
+
+
+# Small curve y^2 = x^3 + 2x + 3 over F_97, which has 100 points.
+SMALL = Curve(97, 2, 3)
+
+
+def naive_mul(curve, k, P):
+    R = None
+    for _ in range(0, abs(k)):
+        R = curve.add(R, P)
+    return R if k >= 0 else curve.neg(R)
+
+
+def test_curve_bad_input():
+    with raises(ValueError):
+        # 4 a^3 + 27 b^2 = 0
+        Curve(97, -3, 2)
+    with raises(ValueError):
+        wnaf(5, 1)
+
+
+def test_wnaf():
+    for w in range(2, 7):
+        for k in range(0, 2000):
+            digits = wnaf(k, w)
+            assert sum(d << i for i, d in enumerate(digits)) == k
+            assert all(d % 2 == 1 and abs(d) < 2 ** (w - 1) for d in digits if d)
+            nonzero = [i for i, d in enumerate(digits) if d]
+            assert all(j - i >= w for i, j in zip(nonzero, nonzero[1:]))
+
+
+def test_small_curve_group():
+    points = [None] + [
+        (x, y) for x in range(0, 97) for y in range(0, 97) if SMALL.contains((x, y))
+    ]
+    assert len(points) == 100
+
+    for P in points:
+        assert SMALL.add(P, SMALL.neg(P)) is None
+        assert SMALL.mul(100, P) is None
+        for k in (-7, 0, 1, 2, 3, 50, 99, 101):
+            for w in (2, 3, 5):
+                assert SMALL.mul(k, P, w) == naive_mul(SMALL, k, P)
+
+
+def test_named_curves():
+    for curve in (SECP256K1, P256):
+        G = curve.G
+        assert curve.contains(G)
+        assert curve.mul(curve.n, G) is None
+        assert curve.mul(curve.n - 1, G) == curve.neg(G)
+
+        for _ in range(0, 10):
+            k, l = randint(-200, 200), randint(0, 200)
+            Q = curve.mul(randint(1, curve.n - 1), G)
+            assert curve.mul(k, G) == naive_mul(curve, k, G)
+            assert curve.mul2(k, G, l, Q) == curve.add(naive_mul(curve, k, G), curve.mul(l, Q))
+
+        ks = [randint(1, curve.n - 1) for _ in range(0, 10)]
+        assert curve.mul_many(ks, G) == [curve.mul(k, G) for k in ks]
+
+        # Jacobian and affine arithmetic should agree.
+        P, Q = curve.mul(3, G), curve.mul(5, G)
+        J = curve.jadd(curve.jdouble(curve.jacobian(P)), curve.jacobian(Q))
+        assert curve.affine(J) == curve.mul(11, G)
+        assert curve.affine(curve.jmadd(curve.jacobian(P), Q)) == curve.mul(8, G)
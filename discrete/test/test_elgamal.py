@@ -0,0 +1,30 @@
+from pytest import raises
+
+from .. import elgamal
+
+
+def test_elgamal_bad_input():
+    with raises(ValueError):
+        elgamal.generate_keys(2, 3)
+
+
+def test_elgamal_encrypt_decrypt():
+    g, p = 2, 2579
+    pkey = elgamal.PrivateKey(p, 765)
+    pubkey = elgamal.PublicKey(p, g, pow(g, 765, p))
+
+    # Small textbook sized example, worked by hand.
+    assert pubkey.A == 949
+    ciphertext = elgamal.encrypt(1299, pubkey, k=853)
+    assert ciphertext == (435, 2396)
+    assert elgamal.decrypt(ciphertext, pkey) == 1299
+
+    assert elgamal.Encryptor(pubkey).encrypt(1299, k=853) == (435, 2396)
+
+
+def test_elgamal_batch():
+    pkey, pubkey = elgamal.generate_keys(3, 2**127 - 1)
+
+    msgs = list(range(1, 50))
+    ciphertexts = elgamal.encrypt_batch(msgs, pubkey)
+    assert elgamal.decrypt_batch(ciphertexts, pkey) == msgs
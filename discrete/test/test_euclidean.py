@@ -1,5 +1,6 @@
 import math
-from ..euclidean import division, extended
+from pytest import raises
+from ..euclidean import division, extended, crt
 from ..primality import FIRST_PRIMES
 
 
@@ -73,3 +74,22 @@ def test_extended_edges():
 
     d, u, v = extended(0, 5)
     assert u == 0 and v == 1 and d == 5
+
+
+def test_crt():
+    assert crt([], []) == (0, 1)
+    assert crt([2, 3, 2], [3, 5, 7]) == (23, 105)
+    # Moduli that are not coprime.
+    assert crt([2, 4], [4, 6]) == (10, 12)
+    assert crt([1, 2], [4, 6]) is None
+
+    for a, b in ((FIRST_PRIMES[i], FIRST_PRIMES[i + 1]) for i in range(0, 10)):
+        for x in range(0, a * b, 7):
+            assert crt([x % a, x % b], [a, b]) == (x, a * b)
+
+
+def test_crt_bad_input():
+    with raises(ValueError):
+        crt([1], [0])
+    with raises(ValueError):
+        crt([1, 2], [3])
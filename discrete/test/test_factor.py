@@ -1,4 +1,8 @@
-from ..factor import pollardpmin1
+import math
+
+from ..factor import pollardpmin1, fermat, williams_pplus1, pollard_rho, ecm, factorint
+from ..arith import is_probable_prime
+from .. import factor
 from ..primality import FIRST_PRIMES
 from pytest import raises
 
@@ -21,3 +25,121 @@ def test_pollardpmin1_easy_cases():
     for n, expected in cases:
         actual = pollardpmin1(n)
         assert expected == actual
+
+
+def test_fermat():
+    cases = [
+        (15, 3),
+        (9, 3),
+        (10, 2),
+        (7, None),
+        (1403, 23),
+        (5959, 59),
+        (101 * 103, 101),
+        # Far apart, takes a while.
+        (3 * 10007, 3),
+        ((10**12 + 39) * (10**12 + 10**7 + 61), 10**12 + 39),
+    ]
+    for n, expected in cases:
+        assert fermat(n, 10**6, vectorize=False) == expected
+        if factor.np is not None:
+            assert fermat(n, 10**6, vectorize=True) == expected
+
+    # Too far apart for the steps given.
+    assert fermat(1000003 * 2000003, 1000, vectorize=False) is None
+    assert fermat(1000003 * 2000003, 10**6, vectorize=False) == 1000003
+    with raises(ValueError):
+        fermat(15, -1)
+
+
+def test_williams_pplus1():
+    # p + 1 = 2 * (distinct primes below 1000), and the same times 50021 for r. q is a random prime.
+    p, r, q = 257155220268024748717, 13350038874926173897, 1388184163669440847262029
+    assert pollardpmin1(p * q, 1000) is None
+    assert williams_pplus1(p * q, 1000) == p
+    # r needs stage 2 to reach 50021.
+    assert williams_pplus1(r * q, 1000, 10000) is None
+    assert williams_pplus1(r * q, 1000, 60000) == r
+    assert williams_pplus1(r * q, 1000, 60000, processes=2) == r
+
+    assert williams_pplus1(15, 10) in (3, 5)
+    assert williams_pplus1(10, 10) == 2
+    assert williams_pplus1(7, 10) is None
+    with raises(ValueError):
+        williams_pplus1(15, 0)
+    with raises(ValueError):
+        williams_pplus1(15, 100, 10)
+
+
+def test_pollard_rho():
+    assert pollard_rho(8051) == 97
+    assert pollard_rho(1000003 * 1000033) in (1000003, 1000033)
+    assert pollard_rho(10) == 2
+    assert pollard_rho(7) is None
+    # Too few steps for a 40 bit factor.
+    assert pollard_rho((2**40 + 15) * (2**61 - 1), 100) is None
+
+
+def test_ecm():
+    with raises(ValueError):
+        ecm(1403, B1=0)
+    with raises(ValueError):
+        ecm(1403, B1=100, B2=10)
+    # Primes, too small for Suyama's curves or not, have no factor to find.
+    for n in (1, 2, 3, 5, 7, 11, 13):
+        assert ecm(n) is None
+    for n in (25, 35, 49, 143):
+        f = ecm(n, seed=1)
+        assert 1 < f < n and n % f == 0
+    assert ecm(2 * 1000003) == 2
+    assert ecm(1000003, curves=3) is None
+
+    cases = [1000003 * 1000033, (2**31 - 1) * (2**61 - 1)]
+    for n in cases:
+        f = ecm(n, seed=1)
+        assert 1 < f < n and n % f == 0
+    # Stage 1 only, with enough curves one of them has a smooth order.
+    n = 1000003 * 1000033
+    f = ecm(n, B1=500, B2=500, curves=200, seed=2)
+    assert f in (1000003, 1000033)
+
+
+def test_factorint():
+    cases = [
+        (1, {}),
+        (2, {2: 1}),
+        (12, {2: 2, 3: 1}),
+        (97, {97: 1}),
+        (2**64, {2: 64}),
+        (3**40, {3: 40}),
+        ((2**61 - 1) ** 3, {2**61 - 1: 3}),
+        ((2**31 - 1) * (2**61 - 1) * 65537**2, {65537: 2, 2**31 - 1: 1, 2**61 - 1: 1}),
+        (1000003 * 1000033, {1000003: 1, 1000033: 1}),
+        (2**64 + 1, {274177: 1, 67280421310721: 1}),
+        (10**20 + 39, {10**20 + 39: 1}),
+        (2**67 - 1, {193707721: 1, 761838257287: 1}),
+    ]
+    for n, expected in cases:
+        assert factorint(n) == expected
+        assert list(factorint(n)) == sorted(expected)
+
+    for n in range(1, 2000):
+        factors = factorint(n)
+        assert math.prod(q**e for q, e in factors.items()) == n
+        assert all(is_probable_prime(q) for q in factors)
+
+    with raises(ValueError):
+        factorint(0)
+    with raises(ValueError):
+        # A 56 bit factor is too much for a thousand steps of rho, without ECM.
+        factorint(2**128 + 1, max_rho=1000, max_curves=0)
+    # Unless the composite cofactor is good enough.
+    n = 2**128 + 1
+    assert factorint(n, max_rho=1000, max_curves=0, partial=True) == {n: 1}
+    assert factorint(3**5 * n**2, max_rho=1000, max_curves=0, partial=True) == {3: 5, n: 2}
+
+
+def test_factorint_ecm():
+    # p +- 1 and q +- 1 have large prime factors, and rho gets too few steps, so only ecm() finds p.
+    p, q = 2**36 + 31, 2**61 + 15
+    assert factorint(p * q * 3, max_rho=1 << 12) == {3: 1, p: 1, q: 1}
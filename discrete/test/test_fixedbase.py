@@ -0,0 +1,39 @@
+from random import randint
+from pytest import raises
+
+from ..fixedbase import FixedBaseExp
+
+
+def test_fixedbase_bad_input():
+    with raises(ValueError):
+        FixedBaseExp(2, 1)
+    with raises(ValueError):
+        FixedBaseExp(2, 101, window=0)
+    with raises(ValueError):
+        FixedBaseExp(2, 101, order=0)
+
+
+def test_fixedbase_matches_pow():
+    # g, p, with some larger moduli to get many rows in the table.
+    cases = [
+        (2, 101),
+        (5, 30757),
+        (3, 2**127 - 1),
+        (7, 2**521 - 1),
+    ]
+
+    for g, p in cases:
+        for window in (1, 3, 4, 7):
+            gexp = FixedBaseExp(g, p, window=window)
+            for x in [0, 1, 2, p - 2, p - 1, p] + [randint(0, p) for _ in range(0, 20)]:
+                assert gexp(x) == pow(g, x, p)
+
+
+def test_fixedbase_negative_and_order():
+    p = 30757
+    gexp = FixedBaseExp(5, p)
+    assert gexp(-1) == pow(5, p - 2, p)
+
+    # 2^11 = 2048 = 1 (mod 23), so 2 has order 11.
+    gexp = FixedBaseExp(2, 23, order=11)
+    assert gexp.batch(range(0, 30)) == [pow(2, x, 23) for x in range(0, 30)]
@@ -0,0 +1,71 @@
+import io
+import json
+import os
+
+from ..jobs import run, run_job
+from ..__main__ import main
+
+JOBS = [
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699, "id": "first"},
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699, "method": "rho"},
+    {"op": "dlog", "g": "0x2", "h": "1821", "p": 2699},
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699, "method": "index_calculus"},
+    {"op": "factor", "n": 23 * 61},
+    {"op": "isprime", "n": 561},
+    {"op": "isprime", "n": 65537},
+    {"op": "dlog", "g": 2, "h": 1821, "p": 2699, "method": "kangaroo", "lo": 700, "hi": 800},
+]
+EXPECTED = [
+    {"line": 1, "op": "dlog", "id": "first", "x": 715},
+    {"line": 2, "op": "dlog", "x": 715},
+    {"line": 3, "op": "dlog", "x": 715},
+    {"line": 4, "op": "dlog", "x": 715},
+    {"line": 5, "op": "factor", "factor": 61},
+    {"line": 6, "op": "isprime", "prime": False},
+    {"line": 7, "op": "isprime", "prime": True},
+    {"line": 8, "op": "dlog", "x": 715},
+]
+
+
+def run_lines(lines, **kwargs):
+    out = io.StringIO()
+    count = run(iter(lines), out, **kwargs)
+    results = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert count == len(results)
+    return results
+
+
+def test_run_job():
+    assert run_job({"op": "factor", "n": 1403, "bound": 4}) == {"op": "factor", "factor": None}
+    assert run_job({"op": "factor", "n": 10403, "method": "fermat"}) == {"op": "factor", "factor": 101}
+    assert run_job({"op": "factor", "n": 10403, "method": "pplus1", "B1": 20}) == {"op": "factor", "factor": 103}
+
+
+def test_run_ordered():
+    lines = [json.dumps(job) + "\n" for job in JOBS]
+    assert run_lines(lines, workers=0) == EXPECTED
+    assert run_lines(lines, workers=2, max_in_flight=2) == EXPECTED
+
+
+def test_run_unordered():
+    lines = [json.dumps(job) + "\n" for job in JOBS]
+    results = run_lines(lines, workers=2, ordered=False, max_in_flight=3)
+    assert sorted(results, key=lambda r: r["line"]) == EXPECTED
+
+
+def test_run_errors():
+    lines = ["not json\n", "\n", "[1, 2]\n", '{"op": "nope"}\n', '{"op": "dlog", "g": 2}\n']
+    results = run_lines(lines, workers=0)
+    # Blank lines are skipped, but still counted.
+    assert [r["line"] for r in results] == [1, 3, 4, 5]
+    assert all("error" in r for r in results)
+
+
+def test_main(tmp_path):
+    jobs, results = os.path.join(tmp_path, "jobs.jsonl"), os.path.join(tmp_path, "out.jsonl")
+    with open(jobs, "w") as f:
+        f.writelines(json.dumps(job) + "\n" for job in JOBS)
+
+    assert main(["run", jobs, "-o", results, "-j", "1"]) == 0
+    with open(results) as f:
+        assert [json.loads(line) for line in f] == EXPECTED
@@ -0,0 +1,55 @@
+from random import Random
+
+from ..linalg import berlekamp_massey, solve_sparse, structured_elimination, wiedemann
+
+
+def random_system(rng, n, extra, q):
+    x = [rng.randrange(0, q) for _ in range(0, n)]
+    rows, rhs = [], []
+    for _ in range(0, n + extra):
+        row = {c: rng.randrange(1, 6) for c in rng.sample(range(0, n), min(n, rng.randrange(1, 6)))}
+        rows.append(row)
+        rhs.append(sum(e * x[c] for c, e in row.items()) % q)
+    return x, rows, rhs
+
+
+def test_berlekamp_massey():
+    q = 101
+    # Fibonacci: s_n - s_(n-1) - s_(n-2) = 0.
+    assert berlekamp_massey([1, 1, 2, 3, 5, 8, 13], q) == [1, q - 1, q - 1]
+    assert berlekamp_massey([0, 0, 0], q) == [1]
+    # Powers of 3: s_n - 3 s_(n-1) = 0.
+    assert berlekamp_massey([pow(3, i, q) for i in range(0, 10)], q) == [1, q - 3]
+
+
+def test_wiedemann():
+    rng = Random(1)
+    q = 1000003
+    for n in (1, 5, 40):
+        x, rows, rhs = random_system(rng, n, 3 * n, q)
+        solution = wiedemann(rows, rhs, q, rng=rng)
+        assert solution == {c: x[c] for c in set(c for r in rows for c in r)}
+
+    # Fewer rows than columns.
+    assert wiedemann([{0: 1, 1: 1}], [1], q) is None
+
+
+def test_solve_sparse():
+    rng = Random(2)
+    for q in (1000003, 7):
+        for n in (3, 20, 60):
+            x, rows, rhs = random_system(rng, n, 10, q)
+            solution = solve_sparse(rows, rhs, q, rng)
+            assert solution is not None
+            # Not every column is necessarily determined, but those that are are right.
+            assert len(solution) >= n // 2
+            assert all(x[c] == v for c, v in solution.items())
+
+
+def test_structured_elimination():
+    q = 101
+    # Column 2 only occurs once and column 3 occurs twice, so both are eliminated.
+    rows = [{0: 1, 1: 1}, {0: 1, 1: 2}, {0: 2, 1: 1, 2: 1}, {0: 1, 3: 1}, {1: 1, 3: 2}]
+    reduced, _, eliminated = structured_elimination(rows, [0] * len(rows), q)
+    assert sorted(col for col, _, _ in eliminated) == [2, 3]
+    assert len(reduced) == 3
@@ -42,6 +42,7 @@ def test_random_prime_none_in_range():
     with raises(ValueError):
         random_prime(8, 9)
 
+
 # Generated with Mathematica.
 ODD_COMPOSITES = [
     55045,
@@ -1,4 +1,8 @@
-from ..shanks import shanks
+import os
+from concurrent.futures import ProcessPoolExecutor
+from ..shanks import shanks, shanks_group, shanks_n, shanks_disk, BabyStepTable
+from ..group import MultiplicativeGroup, ECGroup
+from ..ec import Curve
 from pytest import raises
 
 
@@ -109,3 +113,78 @@ def test_shanks_unsolvable():
 
     for g, h, p in cases:
         assert shanks(g, h, p) is None
+
+
+def test_shanks_group_subgroup():
+    # p = 2 k q + 1 where q is prime, and g = a^((p - 1) / q) has order q.
+    q, p, g = 2069051, 2432099102767, 1081194394585
+    group = MultiplicativeGroup(p, q)
+
+    assert shanks_group(group, g, 734017640817) == 1941624
+    assert shanks_group(group, g, pow(g, q - 1, p)) == q - 1
+    assert shanks_group(group, g, 1) == 0
+
+
+def test_shanks_group_elliptic_curve():
+    # This curve has 10039 points, a prime, so any point but infinity generates it.
+    curve = Curve(10007, 3, 6)
+    group = ECGroup(curve, 10039)
+    P = (5, 4270)
+
+    for x in (0, 1, 2, 1000, 5017, 10038):
+        assert shanks_group(group, P, curve.mul(x, P)) == x
+
+
+def test_shanks_disk(tmp_path):
+    path = os.path.join(tmp_path, "table.bsgs")
+    g, p = 5, 30757
+
+    # Small enough memory to need several runs, which are then merged.
+    with BabyStepTable.build(path, g, p, memory=5000) as table:
+        assert table.m == shanks_n(p)
+        for h in (1, 5, 25940, 30756):
+            assert table.solve(h) == shanks(g, h, p)
+        assert table.solve(0) is None
+
+    # The table is reused, even from another process.
+    assert shanks_disk(g, 25940, p, path) == 24463
+    with ProcessPoolExecutor(1) as pool:
+        assert pool.submit(shanks_disk, g, 25940, p, path).result() == 24463
+    with raises(ValueError):
+        shanks_disk(3, 25940, p, path)
+    with raises(ValueError):
+        shanks_disk(g, 25940, p, path, m=100)
+
+    # Smaller tables need more giant steps, but give the same answers.
+    for m in (1, 7, 1000):
+        os.remove(path)
+        assert shanks_disk(g, 25940, p, path, m=m) == 24463
+
+
+def test_baby_step_table_many_runs(tmp_path):
+    # 5000 entries in runs of 31 are 162 runs, more than are merged at once, so it takes two passes.
+    path = os.path.join(tmp_path, "table.bsgs")
+    g, p = 5, 30757
+    assert 5000 // (5000 // BabyStepTable._RECORD_MEMORY) > BabyStepTable._FAN_IN
+    with BabyStepTable.build(path, g, p, m=5000, memory=5000) as table:
+        assert list(table._keys) == sorted(pow(g, j, p) for j in range(0, 5000))
+        assert all(pow(g, j, p) == key for key, j in zip(table._keys, table._js))
+        for h in (1, 5, 25940, 30756):
+            assert table.solve(h) == shanks(g, h, p)
+
+
+def test_shanks_disk_truncated_keys(tmp_path):
+    # Elements do not fit the 64 bit keys, so only the low bits are stored.
+    path = os.path.join(tmp_path, "table.bsgs")
+    g, p = 3, 2**89 - 1
+    with BabyStepTable.build(path, g, p, m=1000) as table:
+        for x in (0, 999, 1000, 123456):
+            assert table.solve(pow(g, x, p)) == x
+
+
+def test_baby_step_table_bad_file(tmp_path):
+    path = os.path.join(tmp_path, "table.bsgs")
+    with open(path, "wb") as f:
+        f.write(b"this is no table")
+    with raises(ValueError):
+        BabyStepTable.open(path)
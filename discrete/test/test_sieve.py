@@ -0,0 +1,81 @@
+from itertools import islice
+
+import pytest
+from pytest import raises
+
+from .. import sieve
+from ..sieve import primes_up_to, iter_primes
+from ..primality import FIRST_PRIMES
+
+
+def _naive(lo: int, hi: int) -> list:
+    flags = bytearray([1]) * hi
+    flags[0:2] = b"\x00\x00"
+    for i in range(2, int(hi**0.5) + 1):
+        if flags[i]:
+            flags[i * i :: i] = bytes(len(range(i * i, hi, i)))
+    return [i for i in range(max(lo, 0), hi) if flags[i]]
+
+
+@pytest.fixture(params=["bytearray", "numpy"])
+def flags(request, monkeypatch):
+    """Runs a test with either kind of flags, and without anything remembered."""
+    if request.param == "bytearray":
+        monkeypatch.setattr(sieve, "np", None)
+    elif sieve.np is None:
+        pytest.skip("numpy is not installed")
+    limit = sieve.memo_limit()
+    sieve.set_memo_limit(10)
+    yield request.param
+    sieve.set_memo_limit(limit)
+
+
+def test_primes_up_to(flags):
+    assert list(primes_up_to(1)) == []
+    assert list(primes_up_to(2)) == [2]
+    assert list(primes_up_to(FIRST_PRIMES[-1])) == FIRST_PRIMES
+    assert list(primes_up_to(FIRST_PRIMES[-1] - 1)) == FIRST_PRIMES[:-1]
+    # Across several segments.
+    n = 5 * 2 * sieve.SEGMENT + 1
+    assert list(primes_up_to(n)) == _naive(0, n + 1)
+    assert len(primes_up_to(10**6)) == 78498
+
+
+def test_primes_up_to_parallel(flags):
+    n = 3 * 2 * sieve.SEGMENT + 17
+    assert list(primes_up_to(n, processes=3)) == _naive(0, n + 1)
+    assert list(primes_up_to(100, processes=7)) == _naive(0, 101)
+
+
+def test_memo(flags):
+    sieve.set_memo_limit(2 * 10**5)
+    primes = primes_up_to(10**5)
+    assert len(primes) == 9592
+    # A copy, so changing it does not change what is remembered.
+    primes[0] = 4
+    assert primes_up_to(10**5)[0] == 2
+    assert list(primes_up_to(1000)) == _naive(0, 1001)
+    # Past what is remembered only the rest is sieved.
+    assert list(primes_up_to(2 * 10**5)) == _naive(0, 2 * 10**5 + 1)
+    # Beyond the limit nothing more is remembered.
+    assert len(primes_up_to(3 * 10**5)) == 25997
+    assert sieve._memo_bound == 2 * 10**5
+    sieve.set_memo_limit(1000)
+    assert sieve._memo[-1] == 997
+    with raises(ValueError):
+        sieve.set_memo_limit(9)
+
+
+def test_iter_primes(flags):
+    assert list(iter_primes(0, 2)) == []
+    assert list(iter_primes(2, 3)) == [2]
+    assert list(iter_primes(-10, 30)) == _naive(0, 30)
+    assert list(iter_primes(30, 10)) == []
+    assert list(islice(iter_primes(), len(FIRST_PRIMES))) == FIRST_PRIMES
+
+    lo, hi = 10**6 - 2 * sieve.SEGMENT, 10**6 + 3 * sieve.SEGMENT + 1
+    assert list(iter_primes(lo, hi)) == _naive(lo, hi)
+    assert list(iter_primes(hi - 1, hi)) == _naive(hi - 1, hi)
+    # Without an end it goes on past a few changes of the base primes.
+    it = iter_primes(10**6)
+    assert list(islice(it, 10000)) == _naive(10**6, 10**6 + 200000)[:10000]